@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for dop. Run them from the repository root, e.g.:
+
+    $ python -m benchmarks.bench_models
+
+"""
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Throughput and latency of Client methods against the local fake API
+(benchmarks/fakeapi.py), under serial, threaded and async load.
+
+    $ python -m benchmarks.bench_client [--calls 500] [--workers 16]
+          [--latency 0.01] [--error-rate 0] [--droplets 100]
+
+Each mode runs the same number of show_droplet calls, then droplets() is
+timed on its own to show the cost of the payload size. Latencies are per
+call, including retries.
+
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.fakeapi import FakeAPI
+from dop.aio import AsyncClient
+from dop.exceptions import DOPException
+from dop.retry import RetryPolicy
+from dop.workers import imap_bounded
+
+
+def timed(func):
+    def call(*args):
+        start = time.time()
+        try:
+            func(*args)
+        except DOPException:
+            return time.time() - start, False
+        return time.time() - start, True
+    return call
+
+
+def run_serial(api, ids, workers, retry_policy):
+    with api.client(retry_policy=retry_policy) as client:
+        call = timed(client.show_droplet)
+        return [call(droplet_id) for droplet_id in ids]
+
+
+def run_threaded(api, ids, workers, retry_policy):
+    with api.client(retry_policy=retry_policy) as client:
+        call = timed(client.show_droplet)
+        return [result for _, result in imap_bounded(call, ids, workers)]
+
+
+def run_async(api, ids, workers, retry_policy):
+    async def call(client, droplet_id):
+        start = time.time()
+        try:
+            await client.show_droplet(droplet_id)
+        except DOPException:
+            return time.time() - start, False
+        return time.time() - start, True
+
+    async def main():
+        async with AsyncClient('fake_client_id', 'fake_api_key',
+                               host='127.0.0.1', port=api.port, secure=False,
+                               concurrency=workers,
+                               retry_policy=retry_policy) as client:
+            return await asyncio.gather(*[call(client, droplet_id)
+                                          for droplet_id in ids])
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(main())
+    finally:
+        loop.close()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def report(label, results, elapsed):
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, ok in results if not ok)
+    print('%-10s %6d %8.2f %9.1f %8.1f %8.1f %8.1f %6d' % (
+        label, len(results), elapsed, len(results) / elapsed,
+        percentile(latencies, 0.5) * 1000, percentile(latencies, 0.95) * 1000,
+        max(latencies) * 1000, errors))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.01,
+                        help='seconds the server waits before answering')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='share of requests answered with a 503')
+    parser.add_argument('--droplets', type=int, default=100,
+                        help='droplets in the account')
+    parser.add_argument('--modes', default='serial,threaded,async')
+    args = parser.parse_args(argv)
+
+    modes = {'serial': run_serial, 'threaded': run_threaded,
+             'async': run_async}
+    retry_policy = RetryPolicy(backoff=0.01, max_backoff=0.1)
+    with FakeAPI(droplets=args.droplets, latency=args.latency,
+                 error_rate=args.error_rate, error_status=503) as api:
+        ids = [1 + i % args.droplets for i in range(args.calls)]
+        print('%-10s %6s %8s %9s %8s %8s %8s %6s' % (
+            'mode', 'calls', 'seconds', 'calls/s', 'p50 ms', 'p95 ms',
+            'max ms', 'errors'))
+        for mode in args.modes.split(','):
+            start = time.time()
+            results = modes[mode](api, ids, args.workers, retry_policy)
+            report(mode, results, time.time() - start)
+
+        with api.client(retry_policy=retry_policy) as client:
+            call = timed(client.droplets)
+            start = time.time()
+            results = [call() for _ in range(max(1, args.calls // 50))]
+            report('droplets()', results, time.time() - start)
+        print('server requests: %d' % api.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Time to turn a raw list response into models: the previous path
+(``response.json()`` then ``from_json`` per item) against every installed
+dop.decoder backend, and against the incremental parser used by the
+``iter_*`` methods.
+
+    $ python -m benchmarks.bench_decode [payload.json ...]
+
+Without arguments it runs on generated ``images`` and ``domain_records``
+payloads; pass response bodies saved from the API to use real ones. The
+list key is guessed from the payload.
+
+"""
+
+import json
+import sys
+import timeit
+
+from dop.decoder import available_backends, get_decoder
+from dop.streaming import iter_json_array
+from dop.models import Domain, Droplet, Image, Record, Region, Size, SSHKey
+
+MODELS = {
+    'droplets': Droplet,
+    'images': Image,
+    'domains': Domain,
+    'records': Record,
+    'regions': Region,
+    'sizes': Size,
+    'ssh_keys': SSHKey,
+}
+
+
+def images_payload(count=5000):
+    images = [{'id': i, 'name': 'Snapshot %d' % i, 'distribution': 'Ubuntu',
+               'slug': None if i % 3 else 'image-%d' % i, 'public': i % 3 == 0}
+              for i in range(count)]
+    return json.dumps({'status': 'OK', 'images': images}).encode('utf8')
+
+
+def records_payload(count=20000):
+    records = [{'id': i, 'domain_id': i // 50, 'record_type': 'A',
+                'name': 'host%d' % i, 'data': '10.0.%d.%d' % (i // 256 % 256,
+                                                              i % 256),
+                'priority': None, 'port': None, 'weight': None}
+               for i in range(count)]
+    return json.dumps({'status': 'OK', 'records': records}).encode('utf8')
+
+
+def previous_path(raw, key, model):
+    # What requests' response.json() plus the list comprehension did.
+    data = json.loads(raw.decode('utf8'))
+    return [model.from_json(item) for item in data.get(key, [])]
+
+
+def decoder_path(decoder, raw, key, model):
+    data = decoder.loads(raw)
+    return [model.from_json(item) for item in data.get(key, [])]
+
+
+def streaming_path(raw, key, model, chunk_size=16 * 1024):
+    chunks = (raw[i:i + chunk_size] for i in range(0, len(raw), chunk_size))
+    return [model.from_json(item) for item in iter_json_array(chunks, key)]
+
+
+def list_key(raw):
+    for key in json.loads(raw.decode('utf8')):
+        if key in MODELS:
+            return key
+    raise ValueError('no known list in payload')
+
+
+def best_ms(func, repeat=7):
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main(paths):
+    if paths:
+        payloads = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                payloads.append((path, f.read()))
+    else:
+        payloads = [('images', images_payload()),
+                    ('domain_records', records_payload())]
+
+    for name, raw in payloads:
+        key = list_key(raw)
+        model = MODELS[key]
+        baseline = best_ms(lambda: previous_path(raw, key, model))
+        print('%s: %d bytes' % (name, len(raw)))
+        print('  %-24s %8.1f ms' % ('response.json+from_json', baseline))
+        expected = [m.to_json() for m in previous_path(raw, key, model)]
+        paths = [(backend, lambda d=get_decoder(backend):
+                  decoder_path(d, raw, key, model))
+                 for backend in available_backends()]
+        paths.append(('streaming', lambda: streaming_path(raw, key, model)))
+        for label, path in paths:
+            assert [m.to_json() for m in path()] == expected
+            elapsed = best_ms(path)
+            print('  %-24s %8.1f ms  x%.2f' % (label, elapsed,
+                                               baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
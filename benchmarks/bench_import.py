@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Start-up cost of ``import dop.client`` in a fresh interpreter, compared with
+an interpreter that imports nothing.
+
+    $ python -m benchmarks.bench_import [--runs N] [--max-ms MS]
+
+Exits with status 1 if the median import cost is above ``--max-ms``, or if
+importing dop pulls in a dependency that should only be loaded on use.
+
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+# Modules that must only be imported by the first request or credentials
+# file, not by ``import dop.client``.
+LAZY_MODULES = ('requests', 'urllib3', 'Crypto', 'pkg_resources',
+                'concurrent.futures')
+
+CHECK = ('import sys, json, dop.client; '
+         'print(json.dumps([m for m in %r if m in sys.modules]))'
+         % (LAZY_MODULES,))
+
+
+def median_seconds(code, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, '-c', code])
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--runs', type=int, default=15)
+    parser.add_argument('--max-ms', type=float, default=None)
+    args = parser.parse_args(argv)
+
+    baseline = median_seconds('pass', args.runs)
+    imported = median_seconds('import dop.client', args.runs)
+    cost_ms = (imported - baseline) * 1000
+    print('interpreter start-up   %8.1f ms' % (baseline * 1000))
+    print('import dop.client      %8.1f ms' % (imported * 1000))
+    print('cost of importing dop  %8.1f ms' % cost_ms)
+
+    output = subprocess.check_output([sys.executable, '-c', CHECK])
+    eager = json.loads(output.decode('utf8'))
+    status = 0
+    if eager:
+        print('imported eagerly: %s' % ', '.join(eager))
+        status = 1
+    if args.max_ms is not None and cost_ms > args.max_ms:
+        print('import cost above %.1f ms' % args.max_ms)
+        status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Memory per object and construction throughput of the dop.models classes
+compared with the previous ``__dict__`` based classes.
+
+    $ python -m benchmarks.bench_models [count]
+
+"""
+
+import sys
+import timeit
+import tracemalloc
+
+from dop.models import Droplet, Image, Record
+
+
+class LegacyBaseObject(object):
+
+    def to_json(self):
+        res = dict()
+        for k, v in self.__dict__.items():
+            if v:
+                res.update({k: v})
+        return res
+
+
+class LegacyRecord(LegacyBaseObject):
+    def __init__(self, record_id, domain_id, record_type, name, data, priority,
+                 port, weight):
+        self.record_id = record_id
+        self.domain_id = domain_id
+        self.record_type = record_type
+        self.name = name
+        self.data = data
+        self.priority = priority
+        self.port = port
+        self.weight = weight
+
+    @staticmethod
+    def from_json(json):
+        return LegacyRecord(json.get('id'), json.get('domain_id'),
+                            json.get('record_type'), json.get('name'),
+                            json.get('data'), json.get('priority'),
+                            json.get('port'), json.get('weight'))
+
+
+class LegacyImage(LegacyBaseObject):
+    def __init__(self, image_id, name, distribution, slug, public):
+        self.image_id = image_id
+        self.name = name
+        self.slug = slug
+        self.distribution = distribution
+        self.public = public
+
+    @staticmethod
+    def from_json(json):
+        return LegacyImage(json.get('id'), json.get('name'),
+                           json.get('distribution'), json.get('slug'),
+                           json.get('public'))
+
+
+class LegacyDroplet(LegacyBaseObject):
+    def __init__(self, droplet_id, name, image_id, size_id, region_id,
+                 backups_active, ip_address, private_ip_address, locked, status,
+                 created_at, backups, snapshots):
+        self.droplet_id = droplet_id
+        self.name = name
+        self.size_id = size_id
+        self.image_id = image_id
+        self.region_id = region_id
+        self.backups_active = backups_active
+        self.ip_address = ip_address
+        self.private_ip_address = private_ip_address
+        self.locked = locked
+        self.status = status
+        self.created_at = created_at
+        self.backups = backups
+        self.snapshots = snapshots
+
+    @staticmethod
+    def from_json(json):
+        return LegacyDroplet(json.get('id'), json.get('name'),
+                             json.get('image_id'), json.get('size_id'),
+                             json.get('region_id'), json.get('backups_active'),
+                             json.get('ip_address'),
+                             json.get('private_ip_address'), json.get('locked'),
+                             json.get('status'), json.get('created_at'),
+                             json.get('backups'), json.get('snapshots'))
+
+
+def record_json(i):
+    return {'id': i, 'domain_id': i // 50, 'record_type': 'A',
+            'name': 'host%d' % i, 'data': '10.0.%d.%d' % (i // 256 % 256, i % 256),
+            'priority': None, 'port': None, 'weight': None}
+
+
+def image_json(i):
+    return {'id': i, 'name': 'Image %d' % i, 'distribution': 'Ubuntu',
+            'slug': 'image-%d' % i, 'public': True}
+
+
+def droplet_json(i):
+    return {'id': i, 'name': 'droplet-%d' % i, 'image_id': 1, 'size_id': 66,
+            'region_id': 3, 'backups_active': False,
+            'ip_address': '192.0.2.%d' % (i % 256), 'private_ip_address': None,
+            'locked': False, 'status': 'active',
+            'created_at': '2014-06-22T10:00:00Z', 'backups': [],
+            'snapshots': []}
+
+
+CASES = (
+    ('Record', record_json, LegacyRecord, Record),
+    ('Image', image_json, LegacyImage, Image),
+    ('Droplet', droplet_json, LegacyDroplet, Droplet),
+)
+
+
+def bytes_per_object(model, payload):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [model.from_json(json) for json in payload]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Do not count the list holding the objects.
+    return (after - before - sys.getsizeof(objects)) / float(len(objects))
+
+
+def objects_per_second(model, payload, repeat=5):
+    build = lambda: [model.from_json(json) for json in payload]
+    best = min(timeit.repeat(build, number=1, repeat=repeat))
+    return len(payload) / best
+
+
+def main(count=20000):
+    print('%-8s %-8s %14s %16s' % ('model', 'kind', 'bytes/object',
+                                   'objects/second'))
+    for name, make_json, legacy, model in CASES:
+        payload = [make_json(i) for i in range(count)]
+        for kind, cls in (('dict', legacy), ('slots', model)):
+            assert cls.from_json(payload[1]).to_json() == \
+                model.from_json(payload[1]).to_json()
+            print('%-8s %-8s %14.1f %16.0f' % (
+                name, kind, bytes_per_object(cls, payload),
+                objects_per_second(cls, payload)))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
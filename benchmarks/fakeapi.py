@@ -0,0 +1,450 @@
+# -*- coding: utf-8 -*-
+"""
+A local stand-in for the Digital Ocean v1 API, to exercise and measure the
+client without network access.
+
+    >>> from benchmarks.fakeapi import FakeAPI
+    >>> with FakeAPI(droplets=500, latency=0.02) as api:
+    >>>     client = api.client()
+    >>>     client.droplets()
+
+It keeps droplets, images, SSH keys, domains, records and events in memory
+and implements the endpoints used by dop.client.Client. Every response can
+be delayed (latency) and a share of them replaced by errors (error_rate).
+New droplets boot after boot_time seconds and events complete after
+event_time seconds.
+
+"""
+
+import gzip
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlsplit
+
+from dop.client import Client
+
+REGIONS = [
+    {'id': 1, 'name': 'New York 1', 'slug': 'nyc1'},
+    {'id': 2, 'name': 'Amsterdam 1', 'slug': 'ams1'},
+    {'id': 3, 'name': 'San Francisco 1', 'slug': 'sfo1'},
+    {'id': 4, 'name': 'New York 2', 'slug': 'nyc2'},
+]
+SIZES = [
+    {'id': 66, 'name': '512MB', 'slug': '512mb'},
+    {'id': 63, 'name': '1GB', 'slug': '1gb'},
+    {'id': 62, 'name': '2GB', 'slug': '2gb'},
+    {'id': 64, 'name': '4GB', 'slug': '4gb'},
+]
+DROPLET_ACTIONS = ('reboot', 'power_cycle', 'shutdown', 'power_off',
+                   'power_on', 'password_reset', 'resize', 'snapshot',
+                   'restore', 'rebuild', 'rename', 'destroy')
+
+
+class NotFound(Exception):
+    pass
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FakeAPI(object):
+    """
+    In-memory API server listening on 127.0.0.1.
+
+    Optional parameters:
+
+        droplets, images, domains, records_per_domain:
+            Integers, size of the generated account.
+
+        latency:
+            Number, seconds every response is delayed.
+
+        error_rate:
+            Number between 0 and 1, share of requests answered with
+            error_status instead.
+
+        boot_time, event_time:
+            Numbers, seconds for a new droplet to become active and for an
+            event to be done.
+
+        etags:
+            Boolean, when set responses carry an ETag and conditional
+            requests for an unchanged body get a 304.
+
+        compress:
+            Boolean, when set bodies are gzip encoded for clients accepting
+            it.
+    """
+
+    def __init__(self, droplets=100, images=50, domains=10,
+                 records_per_domain=20, latency=0.0, error_rate=0.0,
+                 error_status=500, boot_time=0.0, event_time=0.0, etags=False,
+                 compress=False, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.boot_time = boot_time
+        self.event_time = event_time
+        self.etags = etags
+        self.compress = compress
+        self.random = random.Random(seed)
+        self.requests = 0
+        # (client_id, api_key) pairs the requests were sent with.
+        self.credentials = set()
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1000000)
+        self.server = None
+        self.thread = None
+
+        self.droplets = {}
+        for i in range(1, droplets + 1):
+            self.droplets[i] = self._droplet(i, 'droplet-%d' % i,
+                                             REGIONS[i % len(REGIONS)]['id'],
+                                             SIZES[i % len(SIZES)]['id'], 1,
+                                             status='active')
+        self.images = {}
+        for i in range(1, images + 1):
+            self.images[i] = {'id': i, 'name': 'Image %d' % i,
+                              'distribution': 'Ubuntu',
+                              'slug': 'image-%d' % i if i % 2 else None,
+                              'public': bool(i % 2)}
+        self.ssh_keys = {1: {'id': 1, 'name': 'deploy',
+                             'ssh_pub_key': 'ssh-rsa AAAA deploy'}}
+        self.domains = {}
+        self.records = {}
+        for i in range(1, domains + 1):
+            self.domains[i] = self._domain(i, 'example%d.com' % i)
+            for j in range(records_per_domain):
+                record_id = i * 100000 + j
+                self.records[record_id] = {
+                    'id': record_id, 'domain_id': i, 'record_type': 'A',
+                    'name': 'host%d' % j, 'data': '10.0.%d.%d' % (i, j % 256),
+                    'priority': None, 'port': None, 'weight': None}
+        self.events = {}
+
+    # Server lifecycle.
+
+    def start(self):
+        api = self
+
+        class Handler(_Handler):
+            pass
+        Handler.api = api
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def client(self, client_id='fake_client_id', api_key='fake_api_key',
+               **kwargs):
+        """
+        Returns a Client talking to this server.
+        """
+        return Client(client_id, api_key, host='127.0.0.1', port=self.port,
+                      secure=False, **kwargs)
+
+    # State.
+
+    def _droplet(self, droplet_id, name, region_id, size_id, image_id,
+                 status='new'):
+        return {'id': droplet_id, 'name': name, 'image_id': image_id,
+                'size_id': size_id, 'region_id': region_id,
+                'backups_active': False, 'private_ip_address': None,
+                'ip_address': self._ip(droplet_id) if status == 'active'
+                else None,
+                'locked': False, 'status': status,
+                'created_at': '2014-06-22T10:00:00Z', 'backups': [],
+                'snapshots': [], '_created': time.time()}
+
+    def _domain(self, domain_id, name):
+        return {'id': domain_id, 'name': name, 'ttl': 1800,
+                'live_zone_file': '', 'error': None,
+                'zone_file_with_error': None}
+
+    def _ip(self, droplet_id):
+        return '192.0.%d.%d' % (droplet_id // 256 % 256, droplet_id % 256)
+
+    def _event(self, droplet_id):
+        event_id = next(self.ids)
+        self.events[event_id] = {'id': event_id, 'droplet_id': droplet_id,
+                                 'event_type_id': 1, '_created': time.time()}
+        return event_id
+
+    def _show_droplet(self, droplet):
+        if droplet['status'] == 'new' and \
+                time.time() - droplet['_created'] >= self.boot_time:
+            droplet['status'] = 'active'
+            droplet['ip_address'] = self._ip(droplet['id'])
+        return dict((k, v) for k, v in droplet.items() if k[0] != '_')
+
+    def _show_event(self, event):
+        progress = 1.0
+        if self.event_time > 0:
+            progress = min(1.0, (time.time() - event['_created']) /
+                           self.event_time)
+        done = progress >= 1.0
+        return {'id': event['id'], 'droplet_id': event['droplet_id'],
+                'event_type_id': event['event_type_id'],
+                'action_status': 'done' if done else None,
+                'percentage': '%d' % (progress * 100)}
+
+    def _lookup(self, items, params, kind, required=False):
+        # Droplets are created from a kind_id or a kind_slug parameter.
+        if params.get(kind + '_id'):
+            return int(params[kind + '_id'])
+        for item in items:
+            if item['slug'] is not None and \
+                    item['slug'] == params.get(kind + '_slug'):
+                return item['id']
+        if required:
+            raise NotFound()
+        return items[0]['id']
+
+    def _get(self, table, key):
+        try:
+            return table[int(key)]
+        except (KeyError, ValueError):
+            raise NotFound()
+
+    def _find_domain(self, key):
+        for domain in self.domains.values():
+            if domain['name'] == key:
+                return domain
+        return self._get(self.domains, key)
+
+    # Routing.
+
+    def handle(self, path, params):
+        """
+        Returns the JSON document answering a request.
+        """
+        parts = path.strip('/').split('/')
+        with self.lock:
+            return self._route(parts, params)
+
+    def _route(self, parts, params):
+        ok = {'status': 'OK'}
+        resource = parts[0]
+        rest = parts[1:]
+
+        if resource == 'droplets':
+            if not rest:
+                ok['droplets'] = [self._show_droplet(d)
+                                  for d in self.droplets.values()]
+            elif rest == ['new']:
+                droplet_id = next(self.ids)
+                droplet = self._droplet(
+                    droplet_id, params.get('name'),
+                    self._lookup(REGIONS, params, 'region'),
+                    self._lookup(SIZES, params, 'size'),
+                    self._lookup(list(self.images.values()), params, 'image'))
+                self.droplets[droplet_id] = droplet
+                ok['droplet'] = {'id': droplet_id, 'name': droplet['name'],
+                                 'image_id': droplet['image_id'],
+                                 'size_id': droplet['size_id'],
+                                 'event_id': self._event(droplet_id)}
+            elif len(rest) == 1:
+                ok['droplet'] = self._show_droplet(
+                    self._get(self.droplets, rest[0]))
+            elif rest[1] in DROPLET_ACTIONS:
+                droplet = self._get(self.droplets, rest[0])
+                if rest[1] == 'destroy':
+                    del self.droplets[droplet['id']]
+                elif rest[1] == 'resize':
+                    droplet['size_id'] = self._lookup(SIZES, params, 'size',
+                                                      required=True)
+                ok['event_id'] = self._event(droplet['id'])
+            else:
+                raise NotFound()
+        elif resource == 'regions':
+            ok['regions'] = REGIONS
+        elif resource == 'sizes':
+            ok['sizes'] = SIZES
+        elif resource == 'images':
+            if not rest:
+                mine = params.get('filter') == 'my_images'
+                ok['images'] = [i for i in self.images.values()
+                                if not mine or not i['public']]
+            else:
+                image = None
+                for candidate in self.images.values():
+                    if candidate['slug'] == rest[0]:
+                        image = candidate
+                image = image or self._get(self.images, rest[0])
+                if len(rest) == 1:
+                    ok['image'] = image
+                elif rest[1] == 'destroy':
+                    del self.images[image['id']]
+                elif rest[1] == 'transfer':
+                    ok['event_id'] = self._event(None)
+                else:
+                    raise NotFound()
+        elif resource == 'ssh_keys':
+            if not rest:
+                ok['ssh_keys'] = [dict(id=k['id'], name=k['name'])
+                                  for k in self.ssh_keys.values()]
+            elif rest == ['new']:
+                key_id = next(self.ids)
+                self.ssh_keys[key_id] = {'id': key_id,
+                                         'name': params.get('name'),
+                                         'ssh_pub_key': params.get('ssh_pub_key')}
+                ok['ssh_key'] = self.ssh_keys[key_id]
+            else:
+                key = self._get(self.ssh_keys, rest[0])
+                if len(rest) == 1:
+                    pass
+                elif rest[1] == 'edit':
+                    key['ssh_pub_key'] = params.get('ssh_pub_key')
+                elif rest[1] == 'destroy':
+                    del self.ssh_keys[key['id']]
+                    return ok
+                else:
+                    raise NotFound()
+                ok['ssh_key'] = key
+        elif resource == 'domains':
+            return self._route_domains(rest, params, ok)
+        elif resource == 'events' and len(rest) == 1:
+            ok['event'] = self._show_event(self._get(self.events, rest[0]))
+        else:
+            raise NotFound()
+        return ok
+
+    def _route_domains(self, rest, params, ok):
+        if not rest:
+            ok['domains'] = list(self.domains.values())
+            return ok
+        if rest == ['new']:
+            domain_id = next(self.ids)
+            self.domains[domain_id] = self._domain(domain_id,
+                                                   params.get('name'))
+            ok['domain'] = self.domains[domain_id]
+            return ok
+        domain = self._find_domain(rest[0])
+        if len(rest) == 1:
+            ok['domain'] = domain
+        elif rest[1] == 'destroy':
+            del self.domains[domain['id']]
+        elif rest[1] == 'records':
+            records = rest[2:]
+            if not records:
+                ok['records'] = [r for r in self.records.values()
+                                 if r['domain_id'] == domain['id']]
+            elif records == ['new']:
+                record_id = next(self.ids)
+                record = {'id': record_id, 'domain_id': domain['id'],
+                          'name': None, 'priority': None, 'port': None,
+                          'weight': None}
+                record.update(self._record_fields(params))
+                self.records[record_id] = record
+                ok['domain_record'] = record
+            else:
+                record = self._get(self.records, records[0])
+                if record['domain_id'] != domain['id']:
+                    raise NotFound()
+                if len(records) == 1:
+                    ok['record'] = record
+                elif records[1] == 'edit':
+                    record.update(self._record_fields(params))
+                    ok['record'] = record
+                elif records[1] == 'destroy':
+                    del self.records[record['id']]
+                else:
+                    raise NotFound()
+        else:
+            raise NotFound()
+        return ok
+
+    def _record_fields(self, params):
+        fields = {}
+        for key in ('record_type', 'name', 'data', 'priority', 'port',
+                    'weight'):
+            if key in params:
+                value = params[key]
+                fields[key] = int(value) if key in ('priority', 'port',
+                                                    'weight') else value
+        return fields
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this every response
+    # waits for the client's delayed ACK.
+    disable_nagle_algorithm = True
+    api = None
+
+    def do_GET(self):
+        api = self.api
+        url = urlsplit(self.path)
+        params = dict((k, v[-1]) for k, v in parse_qs(url.query).items())
+        with api.lock:
+            api.requests += 1
+            api.credentials.add((params.get('client_id'),
+                                 params.get('api_key')))
+        if api.latency:
+            time.sleep(api.latency)
+        if api.error_rate and api.random.random() < api.error_rate:
+            return self.reply(api.error_status,
+                              {'status': 'ERROR', 'message': 'Injected error'})
+        if not params.get('client_id') or not params.get('api_key'):
+            return self.reply(200, {'status': 'ERROR',
+                                    'error_message': 'Access Denied'})
+        try:
+            body = api.handle(url.path, params)
+        except NotFound:
+            return self.reply(404, {'status': 'ERROR', 'message': 'Not Found'})
+        self.reply(200, body)
+
+    do_POST = do_GET
+
+    def reply(self, status, document):
+        body = json.dumps(document).encode('utf8')
+        etag = None
+        if self.api.etags and status == 200:
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        if etag:
+            self.send_header('ETag', etag)
+        if self.api.compress and \
+                'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
@@ -18,9 +18,7 @@ Basic usage:
 
 """
 
-from pkg_resources import get_distribution
-
 __title__ = 'dop'
-__version__ = get_distribution('dop').version
+__version__ = '1.6.b6'
 __author__ = 'Antonio H Montero'
 __license__ = 'MIT'
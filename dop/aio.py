@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+dop.aio
+~~~~~~~
+
+This module implements an asyncio flavour of the Digital Ocean client.
+
+Basic usage:
+
+   >>> import asyncio
+   >>> from dop.aio import AsyncClient
+   >>> async def main():
+   >>>     async with AsyncClient('client_id', 'api_key') as client:
+   >>>         ids = [d.droplet_id for d in await client.droplets()]
+   >>>         droplets = await asyncio.gather(*map(client.show_droplet, ids))
+   >>>         async for image in client.iter_images():
+   >>>             print(image.name)
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import asyncio
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+from .client import API_HOST, API_PORT, Client
+from .transport import HTTPTransport
+
+DEFAULT_CONCURRENCY = 10
+
+# Public methods of dop.client.Client that never block, left to the
+# wrapped client.
+LOCAL_METHODS = ('add_hook', 'remove_hook', 'cache_key', 'close',
+                 'fromCredsFile', 'get_url')
+# Methods returning an iterator, exposed as asynchronous iterators.
+ITERATORS = ('iter_droplets', 'iter_images', 'iter_domains',
+             'iter_domain_records', 'iter_all_domain_records',
+             'provision_droplets')
+# Every other public method of dop.client.Client, exposed as a coroutine.
+ENDPOINTS = tuple(name for name, _ in
+                  inspect.getmembers(Client, inspect.isfunction)
+                  if not name.startswith('_') and
+                  name not in LOCAL_METHODS + ITERATORS)
+_DONE = object()
+
+
+class AsyncClient(object):
+    """
+    Coroutine based client with the same endpoints as ``Client``. The
+    ``iter_*`` methods and ``provision_droplets`` return asynchronous
+    iterators to use with ``async for``.
+
+    Calls are dispatched to a bounded pool of workers that share one pooled
+    keep-alive transport, so at most ``concurrency`` requests are in flight
+    no matter how many coroutines are awaiting. Results are the same
+    ``dop.models`` objects and failures raise ``DOPException``.
+
+    Optional parameters:
+
+        concurrency:
+            Integer, maximum number of requests in flight at once.
+
+        transport:
+            A transport shared by every call. By default one is created with
+            ``concurrency`` connections.
+
+    Other keyword arguments, such as timeout or cache, are passed on to the
+    underlying Client.
+    """
+
+    def __init__(self, client_id, api_key, host=API_HOST, port=API_PORT,
+                 secure=True, concurrency=DEFAULT_CONCURRENCY, transport=None,
+                 **kwargs):
+        if concurrency < 1:
+            raise ValueError('concurrency must be a positive integer')
+        self.concurrency = concurrency
+        if transport is None:
+            transport = HTTPTransport(pool_maxsize=concurrency,
+                                      pool_block=True)
+            self._owns_transport = True
+        else:
+            self._owns_transport = False
+        self.client = Client(client_id, api_key, host, port, secure,
+                             transport=transport, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def _call(self, method, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        call = functools.partial(method, self.client, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    def _iterate(self, method, *args, **kwargs):
+        return _AsyncIterator(self, method, args, kwargs)
+
+    def close(self):
+        """
+        This method waits for pending calls and releases the connection pool.
+        It blocks: from a coroutine, use aclose instead.
+        """
+        self._executor.shutdown(wait=True)
+        if self._owns_transport:
+            self.client.transport.close()
+
+    async def aclose(self):
+        """
+        Same as close, without blocking the event loop meanwhile.
+        """
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+class _AsyncIterator(object):
+    """
+    Steps through the iterator returned by a Client method on the workers
+    of an AsyncClient, one item per await.
+    """
+
+    def __init__(self, async_client, method, args, kwargs):
+        self._async_client = async_client
+        self._call = functools.partial(method, async_client.client, *args,
+                                       **kwargs)
+        self._iterator = None
+
+    def __aiter__(self):
+        return self
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._async_client._executor,
+                                          functools.partial(func, *args))
+
+    async def __anext__(self):
+        if self._iterator is None:
+            self._iterator = iter(await self._run(self._call))
+        item = await self._run(next, self._iterator, _DONE)
+        if item is _DONE:
+            raise StopAsyncIteration
+        return item
+
+    async def aclose(self):
+        """
+        This method stops the iteration early and releases the response
+        being read, if any.
+        """
+        close = getattr(self._iterator, 'close', None)
+        if close is not None:
+            await self._run(close)
+
+
+def _coroutine(name):
+    method = getattr(Client, name)
+
+    @functools.wraps(method)
+    async def endpoint(self, *args, **kwargs):
+        return await self._call(method, *args, **kwargs)
+    return endpoint
+
+
+def _async_iterator(name):
+    method = getattr(Client, name)
+
+    @functools.wraps(method)
+    def endpoint(self, *args, **kwargs):
+        return self._iterate(method, *args, **kwargs)
+    return endpoint
+
+
+for _name in ENDPOINTS:
+    setattr(AsyncClient, _name, _coroutine(_name))
+for _name in ITERATORS:
+    setattr(AsyncClient, _name, _async_iterator(_name))
+del _name
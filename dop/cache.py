@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+dop.cache
+~~~~~~~~~
+
+This module implements the response caches that can be plugged into the
+client to avoid fetching rarely changing data (regions, sizes, images...)
+over and over.
+
+Basic usage:
+
+   >>> from dop.client import Client
+   >>> from dop.cache import TTLCache
+   >>> client = Client('client_id', 'api_key', cache=TTLCache())
+   >>> client.regions()  # fetched from the API
+   >>> client.regions()  # served from the cache
+   >>> client.cache.stats()
+   {'hits': 1, 'misses': 1, 'entries': 1}
+
+Use ``SQLiteCache('/path/to/dop.cache')`` instead to share the cached
+responses between processes.
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL = 300
+# Seconds the access time of a SQLiteCache entry may lag behind.
+DEFAULT_TOUCH_INTERVAL = 60
+
+
+class TTLCache(object):
+    """
+    In-memory cache whose entries expire after a time to live and that
+    evicts the least recently used entry once ``max_entries`` is reached.
+
+    Keys are strings. Every method is safe to call from several threads.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL,
+                 clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the value cached under key, or None when it is missing or
+        expired.
+        """
+        with self._lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def peek(self, key):
+        """
+        Same as get but leaves the hits and misses counters alone, for a
+        second lookup made on behalf of the same request.
+        """
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > self.clock():
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+        return None
+
+    def set(self, key, value, ttl=None):
+        """
+        Caches value under key for ttl seconds, the cache default if None.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, prefix=None):
+        """
+        Drops the entry stored under prefix and every entry whose key is
+        prefix followed by a query string. Drops everything if None.
+        """
+        with self._lock:
+            if prefix is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if _matches(key, prefix):
+                    del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self._entries)}
+
+
+class SQLiteCache(object):
+    """
+    Cache stored in a single SQLite file so that several processes, e.g.
+    successive command line invocations, share the cached responses.
+
+    Values are stored as JSON text, so anything the API returns can be
+    cached. Entries expire after their time to live and the least recently
+    used ones are evicted once ``max_entries`` entries or ``max_bytes`` bytes
+    of JSON are stored. The database runs in WAL mode so readers never block
+    on a writer, and every thread and process opens its own connection.
+
+    A lookup only writes to the database when the access time of the entry
+    is more than ``touch_interval`` seconds old, so recency is tracked to
+    that precision and frequent hits do not take the write lock. A database
+    that cannot be read or written, e.g. locked for longer than ``timeout``,
+    behaves as a cache miss instead of failing the request, and failing to
+    invalidate entries does not fail the action that triggered it.
+
+    The hits and misses counters are local to this process.
+    """
+
+    def __init__(self, filename, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=None, ttl=DEFAULT_TTL, timeout=10.0,
+                 touch_interval=DEFAULT_TOUCH_INTERVAL, clock=time.time):
+        self.filename = filename
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.timeout = timeout
+        self.touch_interval = touch_interval
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        with self._connection() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS entries ('
+                       'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                       'expires REAL NOT NULL, accessed REAL NOT NULL)')
+
+    def _connection(self):
+        pid = os.getpid()
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != pid:
+            db = sqlite3.connect(self.filename, timeout=self.timeout)
+            db.execute('PRAGMA journal_mode=WAL')
+            self._local.db = db
+            self._local.pid = pid
+        return db
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        """
+        Returns the value cached under key, or None when it is missing or
+        expired.
+        """
+        value = self.peek(key)
+        self._count(value is not None)
+        return value
+
+    def peek(self, key):
+        """
+        Same as get but leaves the hits and misses counters alone, for a
+        second lookup made on behalf of the same request.
+        """
+        now = self.clock()
+        try:
+            db = self._connection()
+            row = db.execute('SELECT value, expires, accessed FROM entries '
+                             'WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        # Expired entries are left for set() to purge.
+        if row is None or row[1] <= now:
+            return None
+        if now - row[2] >= self.touch_interval:
+            try:
+                with db:
+                    db.execute('UPDATE entries SET accessed = ? WHERE key = ?',
+                               (now, key))
+            except sqlite3.Error:
+                # The access time only orders evictions.
+                pass
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        """
+        Caches value under key for ttl seconds, the cache default if None.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        now = self.clock()
+        try:
+            with self._connection() as db:
+                db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                           (key, json.dumps(value), now + ttl, now))
+                db.execute('DELETE FROM entries WHERE expires <= ?', (now,))
+                self._evict(db)
+        except sqlite3.Error:
+            # Not caching a response is better than failing the request.
+            pass
+
+    def _evict(self, db):
+        if self.max_entries is not None:
+            db.execute('DELETE FROM entries WHERE key IN ('
+                       'SELECT key FROM entries ORDER BY accessed DESC '
+                       'LIMIT -1 OFFSET ?)', (self.max_entries,))
+        if self.max_bytes is not None:
+            rows = db.execute('SELECT key, length(value) FROM entries '
+                              'ORDER BY accessed DESC').fetchall()
+            total = 0
+            for key, size in rows:
+                total += size
+                if total > self.max_bytes:
+                    db.execute('DELETE FROM entries WHERE key = ?', (key,))
+
+    def invalidate(self, prefix=None):
+        """
+        Drops the entry stored under prefix and every entry whose key is
+        prefix followed by a query string. Drops everything if None.
+        """
+        try:
+            with self._connection() as db:
+                if prefix is None:
+                    db.execute('DELETE FROM entries')
+                else:
+                    db.execute('DELETE FROM entries WHERE key = ? OR '
+                               'substr(key, 1, ?) = ?',
+                               (prefix, len(prefix) + 1, prefix + '?'))
+        except sqlite3.Error:
+            # Called once the action is done: failing here would lose its
+            # result, the entries still expire after their time to live.
+            pass
+
+    def stats(self):
+        """
+        Returns the hits and misses counters and the number of entries,
+        None if the database cannot be read.
+        """
+        try:
+            with self._connection() as db:
+                entries = db.execute('SELECT count(*) FROM entries'
+                                     ).fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': entries}
+
+    def close(self):
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+def _matches(key, prefix):
+    return key == prefix or key.startswith(prefix + '?')
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+dop.cassette
+~~~~~~~~~~~~
+
+This module implements transports that record the traffic of a client to a
+cassette file and replay it later without touching the network.
+
+Basic usage:
+
+   >>> from dop.client import Client
+   >>> client = Client('client_id', 'api_key', cassette='runbook.jsonl')
+   >>> client.droplets()   # recorded the first time, replayed afterwards
+
+A cassette holds one JSON document per line, one per response, with the
+method, path and query of the request and the status, headers and body of
+the response. The client_id and api_key are left out of the query and
+replaced in the body, so cassettes can be shared.
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import json
+import os
+import threading
+
+from urllib.parse import urlencode, urlsplit
+
+from .client import CREDENTIAL_PARAMS
+from .exceptions import DOPException
+from .transport import HTTPTransport
+
+SCRUBBED = 'SCRUBBED'
+# Response headers worth keeping, the client reads nothing else.
+RECORDED_HEADERS = ('content-type', 'retry-after', 'ratelimit-', 'etag',
+                    'last-modified')
+
+
+def request_key(method, url, params=None):
+    """
+    Returns the (method, path, query) a response is recorded under. The host
+    and the credentials are ignored.
+    """
+    query = sorted((k, str(v)) for k, v in (params or {}).items()
+                   if k not in CREDENTIAL_PARAMS)
+    return (method, urlsplit(url).path, urlencode(query))
+
+
+class _Headers(dict):
+    """
+    Case-insensitive response headers.
+    """
+
+    def __init__(self, headers):
+        dict.__init__(self, ((k.lower(), v) for k, v in headers.items()))
+
+    def __getitem__(self, name):
+        return dict.__getitem__(self, name.lower())
+
+    def __setitem__(self, name, value):
+        dict.__setitem__(self, name.lower(), value)
+
+    def __contains__(self, name):
+        return dict.__contains__(self, name.lower())
+
+    def get(self, name, default=None):
+        return dict.get(self, name.lower(), default)
+
+
+class ReplayResponse(object):
+    """
+    The parts of a requests.Response the client uses, built from a cassette
+    entry.
+    """
+
+    def __init__(self, status_code, headers, text):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf8')
+        self.headers = _Headers(headers)
+        self.headers['Content-Length'] = str(len(self.content))
+
+    def json(self):
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size):
+        content = self.content
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class RecordingTransport(object):
+    """
+    Sends requests through another transport and appends every response to
+    a cassette file, which is truncated first.
+
+    Optional parameters:
+
+        transport:
+            The transport actually sending the requests, a new HTTPTransport
+            by default.
+    """
+
+    def __init__(self, filename, transport=None):
+        self.filename = filename
+        self._owns_transport = transport is None
+        self.transport = transport or HTTPTransport()
+        self.recorded = 0
+        self._file = open(filename, 'w')
+        self._lock = threading.Lock()
+
+    def send(self, method, url, headers=None, params=None, stream=False,
+             timeout=None):
+        response = self.transport.send(method, url, headers=headers,
+                                       params=params, stream=stream,
+                                       timeout=timeout)
+        # Reading the body here leaves response.iter_content() working on
+        # the buffered copy.
+        text = response.content.decode('utf8', 'replace')
+        for name in CREDENTIAL_PARAMS:
+            value = (params or {}).get(name)
+            if value:
+                text = text.replace(str(value), SCRUBBED)
+        method, path, query = request_key(method, url, params)
+        entry = {
+            'method': method, 'path': path, 'query': query,
+            'status': response.status_code,
+            'headers': dict((k.lower(), v)
+                            for k, v in response.headers.items()
+                            if k.lower().startswith(RECORDED_HEADERS)),
+            'body': text,
+        }
+        line = json.dumps(entry, separators=(',', ':'), sort_keys=True)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            self.recorded += 1
+        return response
+
+    def iter_content(self, response, chunk_size):
+        return self.transport.iter_content(response, chunk_size)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        if self._owns_transport:
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayTransport(object):
+    """
+    Answers requests with the responses of a cassette, without network
+    access. The cassette is indexed by request once when loaded, so every
+    lookup is a dict access.
+
+    Identical requests get the responses recorded for them in order; once
+    they are used up the last one is repeated, or a DOPException is raised
+    if repeat is disabled. A request that was never recorded raises a
+    DOPException.
+    """
+
+    def __init__(self, filename, repeat=True):
+        self.filename = filename
+        self.repeat = repeat
+        self.replayed = 0
+        self._entries = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        with open(filename) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = (entry['method'], entry['path'], entry['query'])
+                self._entries.setdefault(key, []).append(entry)
+
+    def send(self, method, url, headers=None, params=None, stream=False,
+             timeout=None):
+        key = request_key(method, url, params)
+        entries = self._entries.get(key)
+        if not entries:
+            raise DOPException('No recorded response for %s %s?%s' % key)
+        with self._lock:
+            position = self._positions.get(key, 0)
+            if position >= len(entries):
+                if not self.repeat:
+                    raise DOPException('Recorded responses for %s %s?%s '
+                                       'are used up' % key)
+                position = len(entries) - 1
+            self._positions[key] = position + 1
+            self.replayed += 1
+        entry = entries[position]
+        return ReplayResponse(entry['status'], entry['headers'],
+                              entry['body'])
+
+    def iter_content(self, response, chunk_size):
+        return response.iter_content(chunk_size)
+
+    def rewind(self):
+        """
+        Starts replaying every request from its first response again.
+        """
+        with self._lock:
+            self._positions.clear()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_cassette(filename, transport=None):
+    """
+    Returns a ReplayTransport if the cassette exists, otherwise a
+    RecordingTransport creating it.
+    """
+    if os.path.exists(filename):
+        return ReplayTransport(filename)
+    return RecordingTransport(filename, transport)
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+dop.catalogue
+~~~~~~~~~~~~~
+
+This module implements an index of images, sizes, regions and SSH keys to
+look them up by id, slug or name without scanning the API listings.
+
+Basic usage:
+
+   >>> from dop.client import Client
+   >>> from dop.catalogue import Catalogue
+   >>> client = Client('client_id', 'api_key')
+   >>> client.catalogue = Catalogue(client)
+   >>> client.catalogue.image('ubuntu-13-04-x64').image_id
+   1505447
+   >>> client.rebuild_droplet(droplet_id, 'ubuntu-13-04-x64')
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import threading
+import time
+
+from .exceptions import DOPException
+from .models import Image, Region, Size, SSHKey
+
+# Attribute holding the id of each kind of model.
+ID_ATTRIBUTES = {
+    'images': 'image_id',
+    'sizes': 'size_id',
+    'regions': 'region_id',
+    'ssh_keys': 'ssh_key_id',
+}
+MODELS = {
+    Image: 'images',
+    Size: 'sizes',
+    Region: 'regions',
+    SSHKey: 'ssh_keys',
+}
+
+
+def model_id(model):
+    """
+    Returns the id of an Image, Size, Region or SSHKey.
+    """
+    return getattr(model, ID_ATTRIBUTES[MODELS[type(model)]])
+
+
+def is_id(key):
+    """
+    Returns whether key is a numeric id, an integer or a string of digits,
+    rather than a slug or a name.
+    """
+    return isinstance(key, int) or (isinstance(key, str) and key.isdigit())
+
+
+class _Index(object):
+
+    def __init__(self, id_attribute):
+        self.id_attribute = id_attribute
+        self.by_id = {}
+        self.by_slug = {}
+        self.by_name = {}
+        self.refreshed_at = None
+
+    def update(self, models):
+        """
+        Replaces the indexed models, keeping the previous objects of the
+        models that did not change. Returns the number of changes.
+        """
+        by_id = {}
+        changes = 0
+        for model in models:
+            key = getattr(model, self.id_attribute)
+            previous = self.by_id.get(key)
+            if previous is not None and previous.to_json() == model.to_json():
+                model = previous
+            else:
+                changes += 1
+            by_id[key] = model
+        changes += len(set(self.by_id) - set(by_id))
+        if changes:
+            by_slug = {}
+            by_name = {}
+            for model in by_id.values():
+                slug = getattr(model, 'slug', None)
+                if slug:
+                    by_slug[slug] = model
+                if model.name:
+                    by_name[model.name] = model
+            self.by_id, self.by_slug, self.by_name = by_id, by_slug, by_name
+        return changes
+
+    def get(self, key):
+        model = self.by_id.get(key) or self.by_slug.get(key) or \
+            self.by_name.get(key)
+        if model is None and isinstance(key, str) and key.isdigit():
+            model = self.by_id.get(int(key))
+        return model
+
+
+class Catalogue(object):
+    """
+    Index of the catalogue models of an account.
+
+    Each kind ('images', 'sizes', 'regions', 'ssh_keys') is fetched the first
+    time it is needed and kept in dicts by id, slug and name. Looking up a key
+    that is not indexed refreshes only that kind, at most once every
+    ``min_refresh_interval`` seconds, so typos do not hammer the API.
+
+    Optional parameters:
+
+        image_filters:
+            Tuple, filters passed to Client.images to collect images.
+
+        min_refresh_interval:
+            Number, minimum seconds between two refreshes of the same kind
+            triggered by a lookup miss.
+    """
+
+    def __init__(self, client, image_filters=('global', 'my_images'),
+                 min_refresh_interval=60.0, clock=time.time):
+        self.client = client
+        self.image_filters = image_filters
+        self.min_refresh_interval = min_refresh_interval
+        self.clock = clock
+        self._indexes = dict((kind, _Index(attribute))
+                             for kind, attribute in ID_ATTRIBUTES.items())
+        self._lock = threading.Lock()
+
+    def _fetch(self, kind):
+        if kind == 'images':
+            images = []
+            for image_filter in self.image_filters:
+                images.extend(self.client.images(filter=image_filter))
+            return images
+        return getattr(self.client, kind)()
+
+    def refresh(self, kind=None):
+        """
+        This method fetches one kind of model again, or all of them if kind
+        is None, and returns the number of models added, changed or removed.
+        """
+        kinds = [kind] if kind else list(self._indexes)
+        changes = 0
+        for kind in kinds:
+            index = self._index(kind)
+            models = self._fetch(kind)
+            with self._lock:
+                changes += index.update(models)
+                index.refreshed_at = self.clock()
+        return changes
+
+    def _index(self, kind):
+        try:
+            return self._indexes[kind]
+        except KeyError:
+            raise DOPException('Unknown catalogue kind: %s' % kind)
+
+    def get(self, kind, key):
+        """
+        This method returns the model of the given kind whose id, slug or
+        name is key, and raises DOPException if there is none.
+        """
+        index = self._index(kind)
+        if type(key) in MODELS:
+            return key
+        model = index.get(key)
+        if model is None:
+            stale = index.refreshed_at is None or \
+                self.clock() - index.refreshed_at >= self.min_refresh_interval
+            if stale:
+                self.refresh(kind)
+                model = index.get(key)
+        if model is None:
+            raise DOPException('Unknown %s: %s' % (kind[:-1], key))
+        return model
+
+    def resolve(self, kind, key):
+        """
+        This method returns the id of the model of the given kind whose id,
+        slug or name is key. Numeric ids missing from the catalogue, such as
+        images of another account, are returned unchanged.
+        """
+        if type(key) in MODELS:
+            return model_id(key)
+        try:
+            return model_id(self.get(kind, key))
+        except DOPException:
+            if is_id(key):
+                return key
+            raise
+
+    def image(self, key):
+        return self.get('images', key)
+
+    def size(self, key):
+        return self.get('sizes', key)
+
+    def region(self, key):
+        return self.get('regions', key)
+
+    def ssh_key(self, key):
+        return self.get('ssh_keys', key)
@@ -9,29 +9,111 @@ This module implements the Digital Ocean API.
 
 """
 
+from . import __version__
 from .models import Domain, Droplet, Event, Image, Record, Region, Size, SSHKey
+from .catalogue import MODELS, is_id, model_id
 from .credentials import Credentials
-
-import requests
-from pkg_resources import get_distribution
+from .coalesce import SingleFlight
+from .decoder import get_decoder
+from .dns import plan_zone
+from .exceptions import DOPException, TransportError
+from .metrics import endpoint_name
+from .provision import Provisioner
+from .retry import RetryPolicy, is_idempotent
+from .revalidate import Revalidator
+from .streaming import iter_json_array
+from .transport import HTTPTransport, wire_size
+from .workers import DEFAULT_MAX_WORKERS, imap_bounded, map_bounded
+
+import threading
+import time
+
+from urllib.parse import urlencode
 
 API_HOST = 'api.digitalocean.com'
 API_PORT = 80
+# Seconds to wait for the connection and for the response, respectively.
+DEFAULT_TIMEOUT = (10, 60)
+
+# Seconds each catalogue endpoint stays in the response cache.
+CACHE_TTLS = {
+    '/regions': 24 * 60 * 60,
+    '/sizes': 24 * 60 * 60,
+    '/images': 60 * 60,
+    '/ssh_keys': 60 * 60,
+}
+CREDENTIAL_PARAMS = ('client_id', 'api_key')
+STREAM_CHUNK_SIZE = 16 * 1024
+USER_AGENT = 'dop/client v.%s' % __version__
+HOOK_EVENTS = ('before_request', 'after_response', 'on_error', 'on_api_error')
+# Requests made by Client.prefetch, as (target, params).
+PREFETCH_REQUESTS = (
+    ('/regions', None),
+    ('/sizes', None),
+    ('/images', {'filter': 'global'}),
+    ('/images', {'filter': 'my_images'}),
+    ('/ssh_keys', None),
+)
 
 
 class Client(object):
+    """
+    Digital Ocean API client. A single instance can be shared by many
+    threads: every request is built per call, and the transport, caches,
+    rate limiters and metrics it uses are thread-safe.
+    """
 
     def __init__(self, client_id, api_key, host=API_HOST, port=API_PORT,
-                 secure=True):
+                 secure=True, transport=None, cache=None, cache_ttls=None,
+                 timeout=DEFAULT_TIMEOUT, retry_policy=None,
+                 rate_limiter=None, coalesce=False, decoder=None,
+                 cassette=None, prefetch=False, revalidate=False):
         self.client_id = client_id
         self.api_key = api_key
         self.host = host
         self.port = port
         self.secure = secure
+        self.cache = cache
+        self.cache_ttls = dict(CACHE_TTLS if cache_ttls is None else cache_ttls)
+        # Set to a dop.catalogue.Catalogue to pass slugs and names wherever
+        # an image, size or region id is expected.
+        self.catalogue = None
+        # A transport passed in by the caller may be shared with other
+        # clients, so only the one created here is closed by close().
+        # With cassette, the name of a dop.cassette file, responses are
+        # replayed from it if it exists and recorded to it otherwise.
+        self._owns_transport = transport is None or cassette is not None
+        if cassette is not None:
+            from .cassette import open_cassette
+            transport = open_cassette(cassette, transport)
+        self.transport = transport or HTTPTransport()
+        # Either a number or a (connect, read) tuple of seconds.
+        self.timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        # A dop.ratelimit.TokenBucket, every attempt takes a token from it.
+        self.rate_limiter = rate_limiter
+        # With coalesce, concurrent identical reads share one request.
+        self.single_flight = SingleFlight() if coalesce else None
+        # Name of a dop.decoder backend, 'auto' or a Decoder.
+        self.decoder = get_decoder(decoder)
+        # With revalidate, unchanged responses to reads are neither
+        # downloaded again, when the server supports it, nor parsed again.
+        # Actions such as reboot or destroy are never revalidated.
+        self.revalidator = Revalidator() if revalidate else None
+        self._hooks = dict((event, ()) for event in HOOK_EVENTS)
+        self._has_hooks = False
+        self._hooks_lock = threading.Lock()
+        self._prefetch_thread = None
+        # Cache keys of PREFETCH_REQUESTS, coalesced on _prefetch_flight
+        # once prefetch has been called even without coalesce.
+        self._prefetch_keys = frozenset()
+        self._prefetch_flight = None
+        if prefetch:
+            self.prefetch()
 
     @staticmethod
     def fromCredsFile(filename, host=API_HOST, port=API_PORT,
-                 secure=True):
+                 secure=True, **kwargs):
         creds = Credentials(filename)
         if creds.available():
             creds.load()
@@ -39,23 +121,84 @@ class Client(object):
             creds.input()
             creds.save()
         (client_id, api_key) = creds.get()
-        return Client(client_id, api_key, host, port, secure)
+        return Client(client_id, api_key, host, port, secure, **kwargs)
+
+    def close(self):
+        """
+        This method releases the pooled connections held by the client.
+        """
+        if self._owns_transport:
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def prefetch(self, wait=False):
+        """
+        This method fetches regions, sizes, global and account images and
+        SSH keys concurrently in a background thread, so the first calls to
+        those methods are served from the cache, or wait for the request
+        already in flight instead of sending their own. A TTLCache is
+        enabled if the client has none. Only these requests are coalesced,
+        other reads are coalesced only with coalesce.
+
+        Optional parameters
+
+            wait:
+                Boolean, when set the method returns once every response is
+                in the cache.
+        """
+        if self.cache is None:
+            from .cache import TTLCache
+            self.cache = TTLCache()
+        if self._prefetch_flight is None:
+            self._prefetch_flight = SingleFlight()
+            self._prefetch_keys = frozenset(
+                self.cache_key(target, params)
+                for target, params in PREFETCH_REQUESTS)
+        if self._prefetch_thread is None or \
+                not self._prefetch_thread.is_alive():
+            fetch = lambda request: self.request(request[0], 'GET',
+                                                 request[1])
+            # Failures are left for the real calls to report.
+            warm = lambda: list(imap_bounded(fetch, PREFETCH_REQUESTS,
+                                             len(PREFETCH_REQUESTS)))
+            self._prefetch_thread = threading.Thread(target=warm)
+            self._prefetch_thread.daemon = True
+            self._prefetch_thread.start()
+        if wait:
+            self._prefetch_thread.join()
 
 
     def droplets(self):
         """
         This method returns the list of droplets
         """
+        return self._models(self._droplets_json(), 'droplets', Droplet)
+
+    def _droplets_json(self):
+        """
+        Returns the document listing the droplets, also read as is by
+        dop.inventory.
+        """
         json = self.request('/droplets/', method='GET')
         status = json.get('status')
         if status == 'OK':
-            droplet_json = json.get('droplets', [])
-            droplets = [Droplet.from_json(droplet) for droplet in droplet_json]
-            return droplets
+            return json
         else:
             message = json.get('message', None)
             raise DOPException('[%s]: %s' % (status, message))
 
+    def iter_droplets(self):
+        """
+        This method yields the droplets one by one as the response is read,
+        instead of returning them once the whole list has been built.
+        """
+        return self._iter_models('/droplets/', 'droplets', Droplet)
+
     def create_droplet(self, name=None, size=None, image=None, region=None,
                        ssh_key_ids=None, virtio=False, private_networking=False,
                        backups_enabled=False):
@@ -100,7 +243,9 @@ class Client(object):
             raise DOPException('size is required to create a droplet!')
         if not image:
             raise DOPException('image is required to create a droplet!')
-            
+        if not region:
+            raise DOPException('region is required to create a droplet!')
+
         params = dict(name=name, virtio=virtio, private_networking=private_networking,
                       backups_enabled=backups_enabled)
         if ssh_key_ids:
@@ -274,9 +419,17 @@ class Client(object):
                          would like the droplet created
                 size_slug: String, this is the slug of the size with which you
                            would like the droplet created
+                or a Size, its id, or its slug, or its name when a catalogue
+                is set
         """
         if not droplet_id:
             raise DOPException('droplet_id is required to resize a droplet!')
+        if not isinstance(size, dict):
+            if self.catalogue is None and type(size) not in MODELS and \
+                    not is_id(size):
+                size = {'size_slug': size}
+            else:
+                size = {'size_id': self._resolve('sizes', size)}
         params = {}
         size_id = size.get('size_id')
         if size_id:
@@ -320,6 +473,7 @@ class Client(object):
         params = {'name': name}
         json = self.request('/droplets/%s/snapshot' % droplet_id, method='GET',
                             params=params)
+        self.invalidate_cache('/images')
         status = json.get('status')
         if status == 'OK':
             return json.get('event_id')
@@ -340,13 +494,14 @@ class Client(object):
 
             image_id:
                 Numeric, this is the id of the image you would like to use to
-                restore your droplet with
+                restore your droplet with. An Image, or its slug or name when
+                a catalogue is set, are accepted too
         """
         if not droplet_id:
             raise DOPException('droplet_id is required to restore a droplet!')
         if not image_id:
             raise DOPException('image_id is required to rebuild a droplet!')
-        params = {'image_id': image_id}
+        params = {'image_id': self._resolve('images', image_id)}
         json = self.request('/droplets/%s/restore' % droplet_id, method='GET',
                             params=params)
         status = json.get('status')
@@ -369,14 +524,15 @@ class Client(object):
 
             image_id:
                 Numeric, this is the id of the image you would like to use to
-                rebuild  your droplet with
+                rebuild  your droplet with. An Image, or its slug or name when
+                a catalogue is set, are accepted too
         """
         if not droplet_id:
             raise DOPException('droplet_id is required to rebuild a droplet!')
         if not image_id:
             raise DOPException('image_id is required to rebuild a droplet!')
         params = {
-            'image_id': image_id,
+            'image_id': self._resolve('images', image_id),
         }
         json = self.request('/droplets/%s/rebuild' % droplet_id, method='GET',
                             params=params)
@@ -445,6 +601,71 @@ class Client(object):
             message = json.get('message')
             raise DOPException('[%s]: %s' % (status, message))
 
+    def reboot_droplets(self, droplet_ids, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        This method reboots many droplets concurrently, each of them once
+        even if listed several times. It returns a dict mapping every
+        droplet id to its event_id, or to the DOPException raised for that
+        droplet.
+        """
+        return self._bulk(self.reboot_droplet, droplet_ids, max_workers)
+
+    def power_cycle_droplets(self, droplet_ids, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        This method power cycles many droplets concurrently. See
+        reboot_droplets for the returned value.
+        """
+        return self._bulk(self.power_cycle_droplet, droplet_ids, max_workers)
+
+    def shutdown_droplets(self, droplet_ids, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        This method shuts down many droplets concurrently. See
+        reboot_droplets for the returned value.
+        """
+        return self._bulk(self.shutdown_droplet, droplet_ids, max_workers)
+
+    def power_off_droplets(self, droplet_ids, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        This method powers off many droplets concurrently. See
+        reboot_droplets for the returned value.
+        """
+        return self._bulk(self.power_off_droplet, droplet_ids, max_workers)
+
+    def power_on_droplets(self, droplet_ids, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        This method powers on many droplets concurrently. See
+        reboot_droplets for the returned value.
+        """
+        return self._bulk(self.power_on_droplet, droplet_ids, max_workers)
+
+    def snapshot_droplets(self, droplet_ids, name=None,
+                          max_workers=DEFAULT_MAX_WORKERS):
+        """
+        This method snapshots many droplets concurrently, every snapshot
+        getting the same optional name. See reboot_droplets for the returned
+        value.
+        """
+        return self._bulk(self.snapshot_droplet, droplet_ids, max_workers,
+                          name)
+
+    def destroy_droplets(self, droplet_ids, scrub_data=False,
+                         max_workers=DEFAULT_MAX_WORKERS):
+        """
+        This method destroys many droplets concurrently - this is irreversible.
+        See reboot_droplets for the returned value.
+        """
+        return self._bulk(self.destroy_droplet, droplet_ids, max_workers,
+                          scrub_data)
+
+    def _bulk(self, method, droplet_ids, max_workers, *args):
+        # The same droplet listed twice is acted on once, not twice.
+        seen = set()
+        droplet_ids = [droplet_id for droplet_id in droplet_ids
+                       if not (droplet_id in seen or seen.add(droplet_id))]
+        call = lambda droplet_id: method(droplet_id, *args)
+        return map_bounded(call, droplet_ids, max_workers,
+                           errors=(DOPException,))
+
     def regions(self):
         """
         This method will return all the available regions within the
@@ -486,6 +707,18 @@ class Client(object):
             message = json.get('message')
             raise DOPException('[%s]: %s' % (status, message))
 
+    def iter_images(self, filter='global'):
+        """
+        This method yields the images one by one as the response is read. See
+        images for the parameters.
+        """
+        if filter and filter not in ('my_images', 'global'):
+            raise DOPException('"filter" must be either "my_images" or "global"')
+        params = {}
+        if filter:
+            params['filter'] = filter
+        return self._iter_models('/images', 'images', Image, params)
+
     def show_image(self, image_id_or_slug):
         """
         This method displays the attributes of an image.
@@ -526,6 +759,7 @@ class Client(object):
             raise DOPException(msg)
 
         json = self.request('/images/%s/destroy' % image_id_or_slug, method='GET')
+        self.invalidate_cache('/images')
         status = json.get('status')
         return status
 
@@ -540,6 +774,9 @@ class Client(object):
 
             region_id
                 Numeric, this is the id of the region to which you would like to transfer.
+
+        Images and regions can be given as models too, or by slug or name when
+        a catalogue is set.
         """
         if not image_id_or_slug:
             msg = 'image_id_or_slug is required to transfer an image!'
@@ -547,9 +784,11 @@ class Client(object):
 
         if not region_id:
             raise DOPException('region_id is required to transfer an image!')
-        params = {'region_id': region_id}
+        image_id_or_slug = self._resolve('images', image_id_or_slug)
+        params = {'region_id': self._resolve('regions', region_id)}
         json = self.request('/images/%s/transfer' % image_id_or_slug,
                             method='GET', params=params)
+        self.invalidate_cache('/images')
         status = json.get('status')
         if status == 'OK':
             return json.get('event_id')
@@ -587,6 +826,7 @@ class Client(object):
         """
         params = {'name': name, 'ssh_pub_key': ssh_pub_key}
         json = self.request('/ssh_keys/new', method='GET', params=params)
+        self.invalidate_cache('/ssh_keys')
         status = json.get('status')
         if status == 'OK':
             ssh_key_json = json.get('ssh_key')
@@ -618,6 +858,7 @@ class Client(object):
         """
         params = {'ssh_pub_key': ssh_pub_key}
         json = self.request('/ssh_keys/%s/edit' % ssh_key_id, method='GET', params=params)
+        self.invalidate_cache('/ssh_keys')
         status = json.get('status')
         if status == 'OK':
             ssh_key_json = json.get('ssh_key')
@@ -632,6 +873,7 @@ class Client(object):
         This method will delete the SSH key from your account.
         """
         json = self.request('/ssh_keys/%s/destroy' % ssh_key_id, method='GET')
+        self.invalidate_cache('/ssh_keys')
         status = json.get('status')
         return status
 
@@ -664,6 +906,12 @@ class Client(object):
             message = json.get('message')
             raise DOPException('[%s]: %s' % (status, message))
 
+    def iter_domains(self):
+        """
+        This method yields your domains one by one as the response is read.
+        """
+        return self._iter_models('/domains', 'domains', Domain)
+
     def create_domain(self, name, ip_address):
         """
         This method creates a new domain name with an A record for the specified [ip_address].
@@ -734,13 +982,48 @@ class Client(object):
         json = self.request('/domains/%s/records' % domain_id, method='GET')
         status = json.get('status')
         if status == 'OK':
-            records_json = json.get('records', [])
-            records = [Record.from_json(record) for record in records_json]
-            return records
+            return self._models(json, 'records', Record)
         else:
             message = json.get('message')
             raise DOPException('[%s]: %s' % (status, message))
 
+    def iter_domain_records(self, domain_id):
+        """
+        This method yields the records of a domain one by one as the response
+        is read. See domain_records for the parameters.
+        """
+        return self._iter_models('/domains/%s/records' % domain_id, 'records',
+                                 Record)
+
+    def all_domain_records(self, domain_ids=None,
+                           max_workers=DEFAULT_MAX_WORKERS):
+        """
+        This method fetches the records of many domains concurrently. It
+        returns a dict mapping every domain id to its list of records, or to
+        the DOPException raised for that domain.
+
+        Optional parameters
+
+            domain_ids:
+                List of domain ids or names. Every domain of the account by
+                default.
+
+            max_workers:
+                Integer, maximum number of domains fetched at once.
+        """
+        return dict(self.iter_all_domain_records(domain_ids, max_workers))
+
+    def iter_all_domain_records(self, domain_ids=None,
+                                max_workers=DEFAULT_MAX_WORKERS):
+        """
+        This method yields (domain_id, records) pairs as the record lists of
+        the domains come in. See all_domain_records for the parameters.
+        """
+        if domain_ids is None:
+            domain_ids = [domain.domain_id for domain in self.domains()]
+        return imap_bounded(self.domain_records, domain_ids, max_workers,
+                            errors=(DOPException,))
+
     def create_domain_record(self, domain_id, record_type, data, name=None,
                              priority=None, port=None, weight=None):
         """
@@ -892,6 +1175,46 @@ class Client(object):
         status = json.get('status')
         return status
 
+    def sync_domain_records(self, domain_id, records, dry_run=False,
+                            prune=True, record_types=None,
+                            max_workers=DEFAULT_MAX_WORKERS):
+        """
+        This method brings the records of a domain to the given ones. The
+        current records are fetched once and only the differences are
+        applied, concurrently. Returns the dop.dns.ZonePlan, whose errors
+        list the changes that failed.
+
+        Required parameters
+
+            domain_id:
+                Integer or Domain Name (e.g. domain.com), specifies the domain
+                to synchronise.
+
+            records:
+                List of dicts with record_type, name and data, and priority,
+                port and weight where needed, or Records.
+
+        Optional parameters
+
+            dry_run:
+                Boolean, when set the plan is returned without applying it.
+
+            prune:
+                Boolean, when disabled records that are not listed are kept.
+
+            record_types:
+                Iterable of the record types to manage, the others are left
+                alone. All but NS and SOA by default.
+
+            max_workers:
+                Integer, maximum number of changes applied at once.
+        """
+        current = self.domain_records(domain_id)
+        plan = plan_zone(domain_id, current, records, prune, record_types)
+        if not dry_run and plan:
+            plan.apply(self, max_workers)
+        return plan
+
     def events(self, event_id):
         """
         This method is primarily used to report on the progress of an event
@@ -913,43 +1236,325 @@ class Client(object):
             message = json.get('message')
             raise DOPException('[%s]: %s' % (status, message))
 
-    def request(self, target, method='GET', params={}):
+    def wait_for_events(self, event_ids, timeout=None, **kwargs):
+        """
+        This method waits until every event in event_ids is done and returns
+        a dict mapping each event_id to its final Event. Polling is shared
+        across the events and backs off according to their progress, see
+        dop.waiter.EventWaiter for the accepted keyword arguments.
+
+        Optional parameters
+
+            timeout:
+                Number, seconds after which a DOPException is raised if some
+                events are still running.
+        """
+        from .waiter import EventWaiter
+        return EventWaiter(self, **kwargs).wait(event_ids, timeout=timeout)
+
+    def provision_droplets(self, specs, timeout=None, **kwargs):
+        """
+        This method creates a droplet for every spec, a dict of create_droplet
+        keyword arguments, with bounded concurrency, and yields (spec, Droplet)
+        pairs as the droplets become active with an IP address, or
+        (spec, DOPException) if the creation failed. See
+        dop.provision.Provisioner for the accepted keyword arguments.
+
+        Optional parameters
+
+            timeout:
+                Number, seconds after which a DOPException is raised if some
+                droplets are still not ready.
+        """
+        provisioner = Provisioner(self, **kwargs)
+        return provisioner.provision(specs, timeout=timeout)
+
+    def _resolve(self, kind, key):
+        if self.catalogue is not None:
+            return self.catalogue.resolve(kind, key)
+        if type(key) in MODELS:
+            return model_id(key)
+        return key
+
+    def stats(self):
+        """
+        This method returns the counters of the optional components of the
+        client, e.g. {'cache': {'hits': 3, ...}, 'transfer': {...}}.
+        """
+        stats = {}
+        if self.cache is not None:
+            stats['cache'] = self.cache.stats()
+        if self.single_flight is not None:
+            stats['coalescing'] = self.single_flight.stats()
+        if self.revalidator is not None:
+            stats['revalidation'] = self.revalidator.stats()
+        # Responses and body bytes as received and once decompressed.
+        if hasattr(self.transport, 'stats'):
+            stats['transfer'] = self.transport.stats()
+        return stats
+
+    def add_hook(self, event, hook):
+        """
+        This method registers a function called on every HTTP attempt.
+
+        Required parameters
+
+            event:
+                String, one of
+                'before_request': hook(info) before the request is sent.
+                'after_response': hook(info, response) once a response, of
+                                  any status, is received.
+                'on_error': hook(info, error) when no response could be
+                            obtained, error being a TransportError.
+                'on_api_error': hook(info, error) once per request whose
+                                response reports a failure, such as a 200
+                                with status ERROR, error being the
+                                DOPException. info only has the method,
+                                target, endpoint and status.
+
+            hook:
+                Callable. info is a dict with the method, target, endpoint
+                (target without ids), url and attempt number, plus the
+                elapsed seconds, status, response bytes and the bytes
+                received before decompression (wire_bytes). Both sizes are
+                None for streamed responses, whose body is read after the
+                hooks run; transport.stats() counts them once read.
+        """
+        if event not in HOOK_EVENTS:
+            raise DOPException('Unknown hook event: %s' % event)
+        # Hooks lists are replaced, never mutated, so requests in flight
+        # keep iterating over a consistent list without locking.
+        with self._hooks_lock:
+            self._hooks[event] = self._hooks[event] + (hook,)
+            self._has_hooks = True
+
+    def remove_hook(self, event, hook):
+        """
+        This method unregisters a function registered with add_hook.
+        """
+        with self._hooks_lock:
+            self._hooks[event] = tuple(h for h in self._hooks[event]
+                                       if h != hook)
+            self._has_hooks = any(self._hooks.values())
+
+    def invalidate_cache(self, target=None):
+        """
+        This method drops the cached responses of target, e.g. '/images', or
+        of every cached endpoint if target is None.
+        """
+        if self.cache is None:
+            return
+        targets = [target] if target else list(self.cache_ttls)
+        for target in targets:
+            self.cache.invalidate(self.cache_key(target))
+
+    def cache_key(self, target, params=None):
+        query = sorted((k, v) for k, v in (params or {}).items()
+                       if k not in CREDENTIAL_PARAMS)
+        key = '%s:%s' % (self.client_id, target)
+        if query:
+            key = '%s?%s' % (key, urlencode(query))
+        return key
+
+    def request(self, target, method='GET', params=None):
         assert method in ['GET', 'POST'], \
             "Only 'GET' or 'POST' are allowed."
 
+        ttl = None
+        if self.cache is not None and method == 'GET':
+            ttl = self.cache_ttls.get(target)
+        idempotent = is_idempotent(method, target)
+        flight = self.single_flight if idempotent else None
+        revalidate = self.revalidator is not None and idempotent
+        cache_key = None
+        if ttl or flight is not None or revalidate or self._prefetch_keys:
+            cache_key = self.cache_key(target, params)
+        if flight is None and cache_key in self._prefetch_keys:
+            flight = self._prefetch_flight
+        if ttl:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if flight is not None:
+            def fetch():
+                # A call that completed between the lookup above and this
+                # one becoming the leader has already filled the cache. The
+                # miss was counted by that lookup already, caches without
+                # peek count it twice.
+                if ttl:
+                    peek = getattr(self.cache, 'peek', self.cache.get)
+                    cached = peek(cache_key)
+                    if cached is not None:
+                        return cached
+                return self._fetch(target, method, params, cache_key, ttl)
+            return flight.do(cache_key, fetch)
+        return self._fetch(target, method, params, cache_key, ttl)
+
+    def _fetch(self, target, method, params, cache_key, ttl):
+        if self.revalidator is not None and is_idempotent(method, target):
+            response, response_json = self._revalidate(target, params,
+                                                        cache_key)
+        else:
+            response = self._send(target, method, params)
+            response_json = self.decoder.loads(response.content)
+        if response_json:
+            error_msg = response_json.get('error_message')
+            if error_msg:
+                raise self._api_error(target, method, response,
+                                      DOPException(error_msg))
+            status = response_json.get('status')
+            if status == 'OK':
+                if ttl:
+                    self.cache.set(cache_key, response_json, ttl)
+            elif self._hooks['on_api_error']:
+                # The endpoint raises the same error from the document.
+                self._api_error(target, method, response, DOPException(
+                    '[%s]: %s' % (status, response_json.get('message'))))
+            return response_json
+        else:
+            raise self._api_error(target, method, response,
+                                  DOPException(response))
+
+    def _api_error(self, target, method, response, error):
+        """
+        Calls the on_api_error hooks and returns error.
+        """
+        hooks = self._hooks['on_api_error']
+        if hooks:
+            info = {'method': method, 'target': target,
+                    'endpoint': endpoint_name(target),
+                    'status': response.status_code}
+            for hook in hooks:
+                hook(info, error)
+        return error
+
+    def _revalidate(self, target, params, cache_key):
+        revalidator = self.revalidator
+        conditional = revalidator.conditional_headers(cache_key)
+        response = self._send(target, 'GET', params, conditional=conditional)
+        if response.status_code == 304:
+            response_json = revalidator.not_modified_json(cache_key)
+            if response_json is not None:
+                return response, response_json
+            # Dropped from the revalidator meanwhile, ask for the body.
+            response = self._send(target, 'GET', params)
+        return response, revalidator.update(cache_key, response,
+                                            self.decoder.loads)
+
+    def _models(self, json, key, model):
+        if self.revalidator is not None:
+            return self.revalidator.models(json, key, model)
+        return [model.from_json(item) for item in json.get(key, [])]
+
+    def _send(self, target, method, params, stream=False, conditional=None):
         headers = {
-            'User-Agent': 'dop/client v.%s' % get_distribution("dop").version
+            'User-Agent': USER_AGENT
         }
+        # If-None-Match/If-Modified-Since, a 304 is then returned as well.
+        if conditional:
+            headers.update(conditional)
 
+        # Built per call: the caller's params are left untouched, so one
+        # client can serve many threads without sharing request state.
+        params = dict(params or {})
         params['client_id'] = self.client_id
         params['api_key'] = self.api_key
         url = self.get_url(target)
         if method == 'POST':
             headers['Content-Type'] = "application/json"
-            response = requests.post(url, headers=headers, params=params)
-        else:
-            response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            response_json = response.json()
-            if response_json:
-                error_msg = response_json.get('error_message')
-                if error_msg:
-                    raise DOPException(error_msg)
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                if self._has_hooks:
+                    response = self._hooked_send(target, method, url, headers,
+                                                 params, stream, attempt)
                 else:
-                    return response_json
-            else:
-                raise DOPException(response)
-        else:
+                    response = self.transport.send(method, url,
+                                                   headers=headers,
+                                                   params=params,
+                                                   stream=stream,
+                                                   timeout=self.timeout)
+            except TransportError as e:
+                if policy.should_retry(attempt, method, target, error=e):
+                    policy.sleep(policy.delay(attempt))
+                    continue
+                raise
+            if response.status_code == 200 or \
+                    (conditional and response.status_code == 304):
+                return response
+            if policy.should_retry(attempt, method, target,
+                                   status=response.status_code):
+                delay = policy.delay(attempt, response.headers)
+                if delay is not None:
+                    response.close()
+                    policy.sleep(delay)
+                    continue
+            try:
+                body = response.json()
+            except ValueError:
+                body = response.text
             error = ('Status code: %d, full response: %s' %
-                     (response.status_code, response.json()))
+                     (response.status_code, body))
             raise DOPException(error)
 
+    def _hooked_send(self, target, method, url, headers, params, stream,
+                     attempt):
+        hooks = self._hooks
+        info = {'method': method, 'target': target, 'url': url,
+                'endpoint': endpoint_name(target), 'attempt': attempt}
+        for hook in hooks['before_request']:
+            hook(info)
+        start = time.perf_counter()
+        try:
+            response = self.transport.send(method, url, headers=headers,
+                                           params=params, stream=stream,
+                                           timeout=self.timeout)
+        except TransportError as e:
+            info['elapsed'] = time.perf_counter() - start
+            for hook in hooks['on_error']:
+                hook(info, e)
+            raise
+        info['elapsed'] = time.perf_counter() - start
+        info['status'] = response.status_code
+        if stream:
+            # The body is not read yet: Content-Length, when sent, is the
+            # compressed size, so neither size is known here.
+            info['bytes'] = None
+            info['wire_bytes'] = None
+        else:
+            info['bytes'] = len(response.content)
+            info['wire_bytes'] = wire_size(response)
+        for hook in hooks['after_response']:
+            hook(info, response)
+        return response
+
+    def _iter_models(self, target, key, model, params=None):
+        response = self._send(target, 'GET', params or {}, stream=True)
+        members = {}
+        try:
+            chunks = self.transport.iter_content(response, STREAM_CHUNK_SIZE)
+            for item in iter_json_array(chunks, key, members):
+                yield model.from_json(item)
+        finally:
+            response.close()
+        error_msg = members.get('error_message')
+        if error_msg:
+            raise self._api_error(target, 'GET', response,
+                                  DOPException(error_msg))
+        status = members.get('status')
+        if status != 'OK':
+            message = members.get('message')
+            raise self._api_error(target, 'GET', response, DOPException(
+                '[%s]: %s' % (status, message)))
+
     def get_url(self, slug):
         port = "" if self.port == 80 else ":%d" % self.port
         protocol = "https://" if self.secure else "http://"
         base_full_url = "%s%s%s%s" % (protocol, self.host, port, slug)
         return base_full_url
 
-
-class DOPException(Exception):
-    pass
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+dop.coalesce
+~~~~~~~~~~~~
+
+This module implements single-flight coalescing: concurrent identical calls
+share the result of the one that is already in flight.
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import threading
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Runs at most one call per key at a time. Callers arriving while a call
+    with the same key is running wait for it and get its result, or its
+    exception, instead of running their own.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.collapsed = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """
+        Returns func(), or the result of the call with the same key already
+        in flight.
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.collapsed += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {'calls': self.calls, 'collapsed': self.collapsed,
+                    'in_flight': len(self._calls)}
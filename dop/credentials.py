@@ -5,9 +5,9 @@ import textwrap
 import getpass
 
 from binascii import hexlify, unhexlify as hex2bin
-from Crypto.Hash import SHA256
-from Crypto.Cipher import AES
-from Crypto.Random import new as srand
+
+# pycrypto is imported by the methods that need it, so importing dop does
+# not pay for it when credentials are passed directly to the client.
 
 bin2hex = lambda i: hexlify(i).decode('utf8')
 
@@ -55,6 +55,7 @@ class Credentials:
             f.write(self.encrypt(self.client_id, self.api_key, password))
 
     def makeKey(self, password, salt):
+        from Crypto.Hash import SHA256
         salt_hash = SHA256.new()
         salt_hash.update(salt)
         pass_hash = SHA256.new()
@@ -63,6 +64,8 @@ class Credentials:
         return pass_hash.digest()
 
     def encrypt(self, client_id, api_key, password):
+        from Crypto.Cipher import AES
+        from Crypto.Random import new as srand
         rand = srand()
         salt = rand.read(32)
         iv = rand.read(AES.block_size)
@@ -72,6 +75,7 @@ class Credentials:
         return json.dumps([bin2hex(salt), bin2hex(iv), bin2hex(encdata)])
 
     def decrypt(self, file_json_data, password):
+        from Crypto.Cipher import AES
         salt = hex2bin(file_json_data[0])
         iv = hex2bin(file_json_data[1])
         encdata = hex2bin(file_json_data[2])
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+dop.decoder
+~~~~~~~~~~~
+
+This module implements the JSON decoders the client can use to parse the
+API responses. The standard library is used by default; faster parsers are
+used when asked for and installed.
+
+Basic usage:
+
+   >>> from dop.client import Client
+   >>> client = Client('client_id', 'api_key', decoder='auto')
+   >>> client.decoder.name
+   'orjson'
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import importlib
+
+from .exceptions import DOPException
+
+# Backends tried by 'auto', fastest first.
+BACKENDS = ('orjson', 'ujson', 'simplejson', 'json')
+
+
+class Decoder(object):
+    """
+    Parses JSON documents given as bytes with the loads function of a
+    backend module. With text, bytes are decoded as UTF-8 before parsing.
+    """
+
+    def __init__(self, name, loads, text=False):
+        self.name = name
+        self.text = text
+        self._loads = loads
+
+    def loads(self, data):
+        if self.text and isinstance(data, bytes):
+            data = data.decode('utf8')
+        try:
+            return self._loads(data)
+        except ValueError as e:
+            raise DOPException('Invalid JSON response: %s' % e)
+
+    def __repr__(self):
+        return '<Decoder %s>' % self.name
+
+
+def available_backends():
+    """
+    Returns the names of the backends that can be imported.
+    """
+    names = []
+    for name in BACKENDS:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_decoder(backend=None):
+    """
+    Returns a Decoder for backend, which is the name of one of BACKENDS,
+    'auto' for the fastest one installed, or None for the standard library.
+    An object with a loads method is returned unchanged.
+    """
+    if backend is None:
+        backend = 'json'
+    elif hasattr(backend, 'loads'):
+        return backend
+    elif backend == 'auto':
+        backend = available_backends()[0]
+    if backend not in BACKENDS:
+        raise DOPException('Unknown JSON backend: %s' % backend)
+    try:
+        module = importlib.import_module(backend)
+    except ImportError:
+        raise DOPException('JSON backend %s is not installed' % backend)
+    # The standard library accepts bytes but decodes them with the slow
+    # 'surrogatepass' error handler, so it is given text instead.
+    return Decoder(backend, module.loads, text=backend == 'json')
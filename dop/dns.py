@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+dop.dns
+~~~~~~~
+
+This module implements zone synchronisation: the records of a domain are
+brought to a desired state with as few API calls as possible.
+
+Basic usage:
+
+   >>> records = [
+   >>>     {'record_type': 'A', 'name': 'www', 'data': '10.0.0.1'},
+   >>>     {'record_type': 'MX', 'name': '@', 'data': 'mx.example.com.',
+   >>>      'priority': 10},
+   >>> ]
+   >>> plan = client.sync_domain_records('example.com', records, dry_run=True)
+   >>> print(plan)
+   <ZonePlan create=1 update=1 delete=0 unchanged=0>
+   >>> client.sync_domain_records('example.com', records)
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+from .exceptions import DOPException
+from .workers import DEFAULT_MAX_WORKERS, imap_bounded
+
+RECORD_FIELDS = ('record_type', 'name', 'data', 'priority', 'port', 'weight')
+# Fields that can change without the record becoming a different one.
+RECORD_OPTIONS = ('priority', 'port', 'weight')
+# Records delegating the zone, left alone unless asked for explicitly.
+ZONE_RECORD_TYPES = ('NS', 'SOA')
+
+
+def record_key(record):
+    """
+    Returns the (record_type, name, data) identifying a record.
+    """
+    return (record['record_type'], record['name'], record['data'])
+
+
+def _as_dict(record):
+    if isinstance(record, dict):
+        return dict((field, record.get(field)) for field in RECORD_FIELDS)
+    return dict((field, getattr(record, field)) for field in RECORD_FIELDS)
+
+
+class ZonePlan(object):
+    """
+    Changes needed to bring the records of a domain to the desired state.
+
+        create:
+            List of record dicts to create.
+
+        update:
+            List of (Record, record dict) pairs, an existing record and what
+            it is edited into.
+
+        delete:
+            List of Records to destroy.
+
+        unchanged:
+            List of Records already as desired.
+
+        errors:
+            List of (operation, DOPException) pairs for the changes that
+            failed once applied, where operation is 'create', 'update' or
+            'delete'.
+    """
+
+    def __init__(self, domain_id, create, update, delete, unchanged):
+        self.domain_id = domain_id
+        self.create = create
+        self.update = update
+        self.delete = delete
+        self.unchanged = unchanged
+        self.errors = []
+
+    def __len__(self):
+        return len(self.create) + len(self.update) + len(self.delete)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __repr__(self):
+        return '<ZonePlan create=%d update=%d delete=%d unchanged=%d>' % (
+            len(self.create), len(self.update), len(self.delete),
+            len(self.unchanged))
+
+    def apply(self, client, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        This method makes the planned changes, at most max_workers at once.
+        New and edited records go first and stale ones are destroyed last,
+        so a name never goes without records in between. Failures are kept
+        in errors instead of stopping the other changes.
+        """
+        domain_id = self.domain_id
+
+        def create(record):
+            return client.create_domain_record(
+                domain_id, record['record_type'], record['data'],
+                name=record['name'], priority=record['priority'],
+                port=record['port'], weight=record['weight'])
+
+        def update(pair):
+            current, record = pair
+            return client.edit_domain_record(
+                domain_id, current.record_id, record['record_type'],
+                record['data'], name=record['name'],
+                priority=record['priority'], port=record['port'],
+                weight=record['weight'])
+
+        def delete(current):
+            return client.destroy_domain_record(domain_id, current.record_id)
+
+        steps = [('create', create, self.create),
+                 ('update', update, self.update)]
+        changes = [(name, func, item) for name, func, items in steps
+                   for item in items]
+        self._run(changes, max_workers)
+        self._run([('delete', delete, item) for item in self.delete],
+                  max_workers)
+        return self
+
+    def _run(self, changes, max_workers):
+        def call(change):
+            return change[1](change[2])
+        for change, result in imap_bounded(call, changes, max_workers,
+                                           errors=(DOPException,)):
+            if isinstance(result, DOPException):
+                self.errors.append((change[0], result))
+
+
+def plan_zone(domain_id, current, desired, prune=True, record_types=None):
+    """
+    Returns the ZonePlan turning the current Records of a domain into the
+    desired ones, given as dicts with record_type, name, data and optionally
+    priority, port and weight.
+
+    Records are matched on (record_type, name, data). A create and a delete
+    for the same record_type and name are paired into a single edit.
+    priority, port and weight are only compared when given.
+
+    Optional parameters:
+
+        prune:
+            Boolean, when disabled records that are not desired are kept.
+
+        record_types:
+            Iterable of the record types to manage, e.g. ('A', 'CNAME').
+            Records of other types are left alone. By default every type
+            but the NS and SOA records of the zone, which are never pruned
+            unless listed here.
+    """
+    if record_types is not None:
+        record_types = set(record_types)
+
+    def managed(record_type):
+        if record_types is None:
+            return record_type not in ZONE_RECORD_TYPES
+        return record_type in record_types
+
+    existing = {}
+    for record in current:
+        if managed(record.record_type):
+            existing.setdefault(record_key(_as_dict(record)), []).append(record)
+
+    create = []
+    update = []
+    unchanged = []
+    for record in desired:
+        record = _as_dict(record)
+        if not managed(record['record_type']):
+            raise DOPException('Record type %s is not managed' %
+                               record['record_type'])
+        matches = existing.get(record_key(record))
+        if not matches:
+            create.append(record)
+            continue
+        match = matches.pop(0)
+        if any(record[field] is not None and
+               record[field] != getattr(match, field)
+               for field in RECORD_OPTIONS):
+            update.append((match, record))
+        else:
+            unchanged.append(match)
+
+    stale = [record for matches in existing.values() for record in matches]
+    if not prune:
+        return ZonePlan(domain_id, create, update, [], unchanged)
+
+    # Reuse stale records of the same type and name for the new ones: one
+    # edit instead of a create plus a delete.
+    reusable = {}
+    for record in stale:
+        reusable.setdefault((record.record_type, record.name), []).append(record)
+    remaining = []
+    for record in create:
+        candidates = reusable.get((record['record_type'], record['name']))
+        if candidates:
+            update.append((candidates.pop(0), record))
+        else:
+            remaining.append(record)
+    delete = [record for records in reusable.values() for record in records]
+    return ZonePlan(domain_id, remaining, update, delete, unchanged)
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+dop.exceptions
+~~~~~~~~~~~~~~
+
+This module contains the exceptions raised by dop. They are also available
+from dop.client.
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+
+class DOPException(Exception):
+    pass
+
+
+class TransportError(DOPException):
+    """
+    Raised by transports when no response could be obtained. connect_failed
+    tells that the request never reached the server.
+    """
+
+    def __init__(self, message, connect_failed=False):
+        DOPException.__init__(self, message)
+        self.connect_failed = connect_failed
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+dop.inventory
+~~~~~~~~~~~~~
+
+This module implements an indexed snapshot of the droplets of an account
+that is refreshed incrementally and reports what changed between polls.
+
+Basic usage:
+
+   >>> from dop.inventory import Inventory
+   >>> inventory = Inventory(client)
+   >>> inventory.subscribe(lambda changes: print(changes))
+   >>> while True:
+   >>>     inventory.poll()
+   >>>     time.sleep(60)
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import threading
+
+from .exceptions import DOPException
+from .models import Droplet
+
+
+class ChangeSet(object):
+    """
+    Differences between two polls.
+
+        added:
+            List of the new Droplets.
+
+        removed:
+            List of the Droplets that are gone, as last seen.
+
+        changed:
+            Dict mapping each droplet_id whose fields changed to a dict of
+            field -> (old value, new value).
+    """
+
+    def __init__(self, added, removed, changed):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return '<ChangeSet added=%d removed=%d changed=%d>' % (
+            len(self.added), len(self.removed), len(self.changed))
+
+
+class Inventory(object):
+    """
+    Snapshot of the droplets of an account, indexed by id, name, region_id
+    and status.
+
+    Each poll fetches the droplet list once and compares the raw JSON of
+    every droplet with the previous poll; only droplets that were added or
+    changed are turned into Droplet objects and re-indexed, so a poll over
+    an unchanged fleet costs one request and a dict comparison per droplet.
+    """
+
+    INDEXES = ('name', 'region_id', 'status')
+
+    def __init__(self, client):
+        self.client = client
+        self.droplets = {}
+        self._raw = {}
+        self._indexes = dict((field, {}) for field in self.INDEXES)
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener):
+        """
+        Registers listener(change_set), called after every poll that found
+        changes.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _fetch(self):
+        # Same request and error handling as Client.droplets, without
+        # building the models.
+        return self.client._droplets_json().get('droplets', [])
+
+    def poll(self):
+        """
+        This method fetches the droplets, updates the snapshot and returns a
+        ChangeSet with the differences since the previous poll.
+        """
+        droplets_json = self._fetch()
+        with self._lock:
+            changes = self._update(droplets_json)
+        if changes:
+            for listener in list(self._listeners):
+                listener(changes)
+        return changes
+
+    def _update(self, droplets_json):
+        added = []
+        changed = {}
+        seen = set()
+        for droplet_json in droplets_json:
+            droplet_id = droplet_json.get('id')
+            seen.add(droplet_id)
+            previous_json = self._raw.get(droplet_id)
+            if previous_json == droplet_json:
+                continue
+            droplet = Droplet.from_json(droplet_json)
+            previous = self.droplets.get(droplet_id)
+            if previous is None:
+                added.append(droplet)
+            else:
+                fields = dict((field, (getattr(previous, field),
+                                       getattr(droplet, field)))
+                              for field in Droplet.__slots__
+                              if getattr(previous, field) != getattr(droplet, field))
+                if fields:
+                    changed[droplet_id] = fields
+                self._unindex(previous)
+            self._raw[droplet_id] = droplet_json
+            self.droplets[droplet_id] = droplet
+            self._index(droplet)
+
+        removed = []
+        for droplet_id in set(self.droplets) - seen:
+            droplet = self.droplets.pop(droplet_id)
+            del self._raw[droplet_id]
+            self._unindex(droplet)
+            removed.append(droplet)
+        return ChangeSet(added, removed, changed)
+
+    def _index(self, droplet):
+        for field, index in self._indexes.items():
+            index.setdefault(getattr(droplet, field), set()).add(
+                droplet.droplet_id)
+
+    def _unindex(self, droplet):
+        for field, index in self._indexes.items():
+            value = getattr(droplet, field)
+            ids = index.get(value)
+            if ids is not None:
+                ids.discard(droplet.droplet_id)
+                if not ids:
+                    del index[value]
+
+    def get(self, droplet_id):
+        return self.droplets.get(droplet_id)
+
+    def find(self, **criteria):
+        """
+        This method returns the droplets matching every criterion, e.g.
+        find(region_id=3, status='active'). Criteria are name, region_id and
+        status.
+        """
+        with self._lock:
+            ids = None
+            for field, value in criteria.items():
+                if field not in self._indexes:
+                    raise DOPException('Cannot search droplets by %s' % field)
+                matches = self._indexes[field].get(value, set())
+                ids = set(matches) if ids is None else ids & matches
+            if ids is None:
+                ids = self.droplets
+            return [self.droplets[droplet_id] for droplet_id in ids]
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+dop.metrics
+~~~~~~~~~~~
+
+This module implements a collector of per-endpoint request metrics fed by
+the client hooks.
+
+Basic usage:
+
+   >>> from dop.client import Client
+   >>> from dop.metrics import MetricsCollector
+   >>> client = Client('client_id', 'api_key')
+   >>> metrics = MetricsCollector().install(client)
+   >>> client.droplets()
+   >>> metrics.as_dict()['/droplets']['count']
+   1
+   >>> print(metrics.to_prometheus())
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import threading
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0)
+
+# Path segments followed by the id or name of one of their items.
+COLLECTIONS = frozenset(['droplets', 'images', 'ssh_keys', 'domains',
+                         'records', 'events'])
+
+
+def endpoint_name(target):
+    """
+    Returns target with the ids replaced by ':id', e.g.
+    '/droplets/12/reboot' -> '/droplets/:id/reboot'.
+    """
+    parts = []
+    previous = None
+    for part in target.strip('/').split('/'):
+        parts.append(':id' if previous in COLLECTIONS and part != 'new'
+                     else part)
+        previous = part
+    return '/' + '/'.join(parts)
+
+
+class _EndpointMetrics(object):
+
+    def __init__(self, buckets):
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.wire_bytes = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(buckets)
+        self.statuses = {}
+
+
+class MetricsCollector(object):
+    """
+    Records, for every endpoint, the number of requests, of errors, a
+    latency histogram, the HTTP statuses and the bytes received, once
+    decompressed and as sent over the network, streamed responses
+    excepted since their body is read later. Responses with an error
+    status (400 and above), responses reporting an API error such as a 200
+    with status ERROR, and failed connections count as errors, a 304
+    answering a conditional request does not. Safe to share between threads
+    and clients.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def install(self, client):
+        """
+        Registers the collector hooks on client and returns the collector.
+        """
+        client.add_hook('after_response', self.after_response)
+        client.add_hook('on_error', self.on_error)
+        client.add_hook('on_api_error', self.on_api_error)
+        return self
+
+    def _record(self, info, error):
+        elapsed = info['elapsed']
+        with self._lock:
+            metrics = self._endpoints.get(info['endpoint'])
+            if metrics is None:
+                metrics = _EndpointMetrics(self.buckets)
+                self._endpoints[info['endpoint']] = metrics
+            metrics.count += 1
+            metrics.latency_sum += elapsed
+            for i, bound in enumerate(self.buckets):
+                if elapsed <= bound:
+                    metrics.latency_buckets[i] += 1
+                    break
+            status = info.get('status')
+            if status is not None:
+                metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            metrics.bytes += info.get('bytes') or 0
+            wire_bytes = info.get('wire_bytes')
+            if wire_bytes is None:
+                wire_bytes = info.get('bytes') or 0
+            metrics.wire_bytes += wire_bytes
+            if error:
+                metrics.errors += 1
+
+    def after_response(self, info, response):
+        # A 304 answers a conditional request, it is not a failure.
+        self._record(info, response.status_code >= 400)
+
+    def on_error(self, info, error):
+        self._record(info, True)
+
+    def on_api_error(self, info, error):
+        # The response was recorded already, as an error too if its HTTP
+        # status was one.
+        status = info.get('status')
+        if status is not None and status >= 400:
+            return
+        with self._lock:
+            metrics = self._endpoints.get(info['endpoint'])
+            if metrics is None:
+                metrics = _EndpointMetrics(self.buckets)
+                self._endpoints[info['endpoint']] = metrics
+            metrics.errors += 1
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def as_dict(self):
+        """
+        Returns the metrics of every endpoint. Histogram buckets are
+        cumulative, as in Prometheus, and keyed by their upper bound.
+        """
+        res = {}
+        with self._lock:
+            for endpoint, metrics in self._endpoints.items():
+                cumulative = 0
+                buckets = []
+                for bound, count in zip(self.buckets, metrics.latency_buckets):
+                    cumulative += count
+                    buckets.append((bound, cumulative))
+                buckets.append(('+Inf', metrics.count))
+                res[endpoint] = {
+                    'count': metrics.count,
+                    'errors': metrics.errors,
+                    'error_rate': float(metrics.errors) / metrics.count,
+                    'bytes': metrics.bytes,
+                    'wire_bytes': metrics.wire_bytes,
+                    'statuses': dict(metrics.statuses),
+                    'latency': {
+                        'sum': metrics.latency_sum,
+                        'count': metrics.count,
+                        'buckets': buckets,
+                    },
+                }
+        return res
+
+    def to_prometheus(self, prefix='dop'):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        metrics = self.as_dict()
+        lines = [
+            '# HELP %s_request_duration_seconds Latency of API requests.' % prefix,
+            '# TYPE %s_request_duration_seconds histogram' % prefix,
+        ]
+        for endpoint in sorted(metrics):
+            latency = metrics[endpoint]['latency']
+            for bound, count in latency['buckets']:
+                lines.append('%s_request_duration_seconds_bucket{endpoint="%s",'
+                             'le="%s"} %d' % (prefix, endpoint, bound, count))
+            lines.append('%s_request_duration_seconds_sum{endpoint="%s"} %f'
+                         % (prefix, endpoint, latency['sum']))
+            lines.append('%s_request_duration_seconds_count{endpoint="%s"} %d'
+                         % (prefix, endpoint, latency['count']))
+        for name, key, help_text in (
+                ('requests_total', 'count', 'API requests sent.'),
+                ('request_errors_total', 'errors', 'API requests that failed.'),
+                ('response_bytes_total', 'bytes', 'Bytes of API responses.'),
+                ('response_wire_bytes_total', 'wire_bytes',
+                 'Bytes of API responses before decompression.')):
+            lines.append('# HELP %s_%s %s' % (prefix, name, help_text))
+            lines.append('# TYPE %s_%s counter' % (prefix, name))
+            for endpoint in sorted(metrics):
+                lines.append('%s_%s{endpoint="%s"} %d'
+                             % (prefix, name, endpoint, metrics[endpoint][key]))
+        return '\n'.join(lines) + '\n'
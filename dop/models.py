@@ -2,16 +2,25 @@
 
 
 class BaseObject(object):
+    # Models are created by the thousand when listing big accounts, so they
+    # declare their fields in __slots__ instead of carrying a __dict__. The
+    # order of __slots__ is the order of the keys returned by to_json().
+    __slots__ = ()
 
     def to_json(self):
         res = dict()
-        for k, v in self.__dict__.items():
+        for k in self.__slots__:
+            v = getattr(self, k)
             if v:
                 res.update({k: v})
         return res
 
 
 class Droplet(BaseObject):
+    __slots__ = ('droplet_id', 'name', 'size_id', 'image_id', 'region_id',
+                 'backups_active', 'ip_address', 'private_ip_address', 'locked',
+                 'status', 'created_at', 'backups', 'snapshots')
+
     def __init__(self, droplet_id, name, image_id, size_id, region_id,
                  backups_active, ip_address, private_ip_address, locked, status,
                  created_at, backups, snapshots):
@@ -52,6 +61,9 @@ class Droplet(BaseObject):
 
 
 class Event(BaseObject):
+    __slots__ = ('event_id', 'action_status', 'droplet_id', 'event_type_id',
+                 'percentage')
+
     def __init__(self, event_id, action_status, droplet_id, event_type_id, percentage):
         self.event_id = event_id
         self.action_status = action_status
@@ -71,6 +83,8 @@ class Event(BaseObject):
 
 
 class Region(BaseObject):
+    __slots__ = ('region_id', 'name', 'slug')
+
     def __init__(self, region_id, name, slug):
         self.region_id = region_id
         self.name = name
@@ -86,6 +100,8 @@ class Region(BaseObject):
 
 
 class Image(BaseObject):
+    __slots__ = ('image_id', 'name', 'slug', 'distribution', 'public')
+
     def __init__(self, image_id, name, distribution, slug, public):
         self.image_id = image_id
         self.name = name
@@ -105,6 +121,8 @@ class Image(BaseObject):
 
 
 class Size(BaseObject):
+    __slots__ = ('size_id', 'name', 'slug')
+
     def __init__(self, size_id, name, slug):
         self.size_id = size_id
         self.name = name
@@ -120,6 +138,8 @@ class Size(BaseObject):
 
 
 class SSHKey(BaseObject):
+    __slots__ = ('ssh_key_id', 'name', 'ssh_pub_key')
+
     def __init__(self, ssh_key_id, name, ssh_pub_key):
         self.ssh_key_id = ssh_key_id
         self.name = name
@@ -135,6 +155,9 @@ class SSHKey(BaseObject):
 
 
 class Domain(BaseObject):
+    __slots__ = ('domain_id', 'name', 'ttl', 'live_zone_file', 'error',
+                 'zone_file_with_error')
+
     def __init__(self, domain_id, name, ttl, live_zone_file, error, zone_file_with_error):
         self.domain_id = domain_id
         self.name = name
@@ -156,6 +179,9 @@ class Domain(BaseObject):
 
 
 class Record(BaseObject):
+    __slots__ = ('record_id', 'domain_id', 'record_type', 'name', 'data', 'priority',
+                 'port', 'weight')
+
     def __init__(self, record_id, domain_id, record_type, name, data, priority,
                  port, weight):
         self.record_id = record_id
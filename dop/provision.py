@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+dop.provision
+~~~~~~~~~~~~~
+
+This module implements batch provisioning: many droplets are created
+concurrently and handed back one by one as soon as each of them is up.
+
+Basic usage:
+
+   >>> specs = [dict(name='web%d' % i, size={'size_slug': '1gb'},
+   >>>               image={'image_slug': 'ubuntu-14-04-x64'},
+   >>>               region={'region_slug': 'nyc2'}) for i in range(100)]
+   >>> for spec, droplet in client.provision_droplets(specs, timeout=900):
+   >>>     print(spec['name'], droplet.ip_address)
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import time
+
+from .exceptions import DOPException
+from .workers import DEFAULT_MAX_WORKERS
+
+ACTIVE = 'active'
+
+
+class Provisioner(object):
+    """
+    Creates droplets with at most max_workers create requests in flight and
+    follows them until they are active and have an IP address.
+
+    A single poller serves every droplet: each round fetches the droplet
+    list once, instead of one show_droplet per droplet, so the number of
+    requests while waiting does not grow with the size of the batch.
+
+    Optional parameters:
+
+        max_workers:
+            Integer, maximum number of create requests sent at once.
+
+        poll_interval:
+            Number, seconds between two fetches of the droplet list.
+    """
+
+    def __init__(self, client, max_workers=DEFAULT_MAX_WORKERS,
+                 poll_interval=5.0, clock=time.time, sleep=time.sleep):
+        self.client = client
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.sleep = sleep
+
+    def provision(self, specs, timeout=None):
+        """
+        This method creates a droplet for every spec, a dict of
+        Client.create_droplet keyword arguments, and yields (spec, Droplet)
+        pairs as the droplets become active. A spec whose creation failed,
+        including a malformed one, is yielded with a DOPException instead.
+
+        Optional parameters
+
+            timeout:
+                Number, seconds after which a DOPException is raised if some
+                droplets are still not ready. Waits forever by default.
+        """
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+        from concurrent.futures import wait
+
+        specs = list(specs)
+        if not specs:
+            return
+        deadline = None if timeout is None else self.clock() + timeout
+
+        def create(spec):
+            try:
+                return self.client.create_droplet(**spec)
+            except (AttributeError, KeyError, TypeError) as e:
+                # A malformed spec must not abort the rest of the batch.
+                raise DOPException('Invalid droplet spec %r: %s' %
+                                   (spec.get('name'), e))
+
+        workers = max(1, min(self.max_workers, len(specs)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            creating = dict((executor.submit(create, spec), spec)
+                            for spec in specs)
+            booting = {}
+            next_poll = self.clock() + self.poll_interval
+            try:
+                while creating or booting:
+                    for future in [f for f in creating if f.done()]:
+                        spec = creating.pop(future)
+                        try:
+                            booting[future.result().droplet_id] = spec
+                        except DOPException as e:
+                            yield spec, e
+
+                    now = self.clock()
+                    if booting and now >= next_poll:
+                        for droplet in self._ready(booting):
+                            yield booting.pop(droplet.droplet_id), droplet
+                        now = self.clock()
+                        next_poll = now + self.poll_interval
+                    if not creating and not booting:
+                        break
+
+                    if deadline is not None and now >= deadline:
+                        names = ', '.join(str(spec.get('name')) for spec in
+                                          list(creating.values()) +
+                                          list(booting.values()))
+                        raise DOPException('Timed out provisioning droplets: '
+                                           '%s' % names)
+                    if not booting:
+                        # Nothing to poll for, only a create completing or
+                        # the deadline can change anything.
+                        wake_up = deadline
+                    elif deadline is None:
+                        wake_up = next_poll
+                    else:
+                        wake_up = min(next_poll, deadline)
+                    if creating:
+                        # Wake up early to start tracking new droplets.
+                        wait(creating, None if wake_up is None else
+                             max(wake_up - now, 0),
+                             return_when=FIRST_COMPLETED)
+                    elif wake_up > now:
+                        self.sleep(wake_up - now)
+            finally:
+                for future in creating:
+                    future.cancel()
+
+    def _ready(self, booting):
+        """
+        Returns the booting droplets that are up, from one droplet list.
+        A failed poll is retried on the next round.
+        """
+        try:
+            droplets = self.client.droplets()
+        except DOPException:
+            return []
+        return [droplet for droplet in droplets
+                if droplet.droplet_id in booting and
+                droplet.status == ACTIVE and droplet.ip_address]
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+dop.ratelimit
+~~~~~~~~~~~~~
+
+This module implements client side rate limiters that keep concurrent
+callers under the API rate limits.
+
+Basic usage:
+
+   >>> from dop.client import Client
+   >>> from dop.ratelimit import TokenBucket
+   >>> client = Client('client_id', 'api_key',
+   >>>                 rate_limiter=TokenBucket(rate=5, burst=10))
+
+Use ``FileTokenBucket('/tmp/dop.bucket', rate=5)`` to share the limit
+between processes.
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_state = struct.Struct('dd')
+
+
+class TokenBucket(object):
+    """
+    Token bucket shared by the threads of a process.
+
+    Tokens are added ``rate`` times per second up to ``burst``, and every
+    call takes one. Callers reserve their token while holding the lock and
+    sleep outside of it, so they go through in arrival order at the
+    configured rate.
+
+    Optional parameters:
+
+        burst:
+            Number, maximum tokens that can be taken at once after a quiet
+            period. Defaults to rate, i.e. one second worth of calls.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.time, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def _reserve(self, tokens, now, available, updated):
+        """
+        Takes tokens from a bucket holding available tokens at updated and
+        returns the new state and the seconds to wait for them.
+        """
+        available = min(self.burst, available + (now - updated) * self.rate)
+        available -= tokens
+        wait = -available / self.rate if available < 0 else 0.0
+        return available, now, wait
+
+    def acquire(self, tokens=1):
+        """
+        Blocks until tokens are available and takes them.
+        """
+        with self._lock:
+            self._tokens, self._updated, wait = self._reserve(
+                tokens, self.clock(), self._tokens, self._updated)
+        if wait > 0:
+            self.sleep(wait)
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a small file, locked with flock, so
+    that every process using the same file shares the rate. Only available
+    on POSIX systems.
+    """
+
+    def __init__(self, filename, rate, burst=None, clock=time.time,
+                 sleep=time.sleep):
+        if fcntl is None:
+            raise RuntimeError('FileTokenBucket needs fcntl, not available '
+                               'on this platform')
+        TokenBucket.__init__(self, rate, burst, clock, sleep)
+        self.filename = filename
+        self._fd = os.open(filename, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def acquire(self, tokens=1):
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                now = self.clock()
+                data = os.pread(self._fd, _state.size, 0)
+                if len(data) == _state.size:
+                    available, updated = _state.unpack(data)
+                else:
+                    available, updated = self.burst, now
+                available, updated, wait = self._reserve(tokens, now,
+                                                         available, updated)
+                os.pwrite(self._fd, _state.pack(available, updated), 0)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        if wait > 0:
+            self.sleep(wait)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+dop.retry
+~~~~~~~~~
+
+This module implements the policy deciding when and after how long a failed
+API call is attempted again.
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import random
+import time
+
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# Every call of the API is a GET, so whether it is safe to repeat depends on
+# the action it performs, which is the last segment of the target.
+MUTATING_ACTIONS = frozenset([
+    'new', 'edit', 'destroy', 'reboot', 'power_cycle', 'shutdown',
+    'power_off', 'power_on', 'password_reset', 'resize', 'snapshot',
+    'restore', 'rebuild', 'rename', 'transfer',
+])
+
+
+def is_idempotent(method, target):
+    """
+    Tells whether repeating the call does not change its outcome.
+    """
+    if method != 'GET':
+        return False
+    action = target.rstrip('/').rsplit('/', 1)[-1]
+    return action not in MUTATING_ACTIONS
+
+
+def retry_after(headers, now=None):
+    """
+    Returns the seconds the server asked to wait before the next call, from
+    the Retry-After header or an exhausted rate limit, or None.
+    """
+    value = headers.get('Retry-After')
+    if value:
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        from email.utils import mktime_tz, parsedate_tz
+        date = parsedate_tz(value)
+        if date is not None:
+            return max(0.0, mktime_tz(date) - (now or time.time()))
+    remaining = headers.get('RateLimit-Remaining')
+    reset = headers.get('RateLimit-Reset')
+    if remaining == '0' and reset and reset.isdigit():
+        return max(0.0, int(reset) - (now or time.time()))
+    return None
+
+
+class RetryPolicy(object):
+    """
+    Retries failed calls with exponential backoff.
+
+    The n-th retry waits ``backoff * 2 ** (n - 1)`` seconds, at most
+    ``max_backoff``, drawn at random between zero and that value when jitter
+    is enabled so that many clients do not retry in lockstep. A delay given
+    by the server through Retry-After or the rate limit headers is honoured
+    instead, and the call fails right away if it is longer than
+    ``max_backoff``.
+
+    Only idempotent calls are retried, unless ``retry_non_idempotent`` is
+    set. Calls rejected with 429 and connections that could not be opened
+    are always safe to retry since the server never acted on them.
+
+    Optional parameters:
+
+        max_attempts:
+            Integer, total number of attempts, 1 disables retries.
+
+        retry_statuses:
+            Set of the HTTP status codes worth retrying.
+    """
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, backoff=0.5,
+                 max_backoff=30.0, jitter=True, retry_statuses=RETRY_STATUSES,
+                 retry_non_idempotent=False, sleep=time.sleep,
+                 random=random.random):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_non_idempotent = retry_non_idempotent
+        self.sleep = sleep
+        self.random = random
+
+    def should_retry(self, attempt, method, target, status=None, error=None):
+        """
+        Tells whether a call that failed on its attempt-th attempt, with an
+        HTTP status or a TransportError, is attempted again.
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if status is not None and status not in self.retry_statuses:
+            return False
+        never_reached = status == 429 or \
+            getattr(error, 'connect_failed', False)
+        return never_reached or self.retry_non_idempotent or \
+            is_idempotent(method, target)
+
+    def delay(self, attempt, headers=None):
+        """
+        Returns the seconds to wait before the next attempt, or None if the
+        server asked to wait longer than max_backoff.
+        """
+        if headers is not None:
+            wait = retry_after(headers)
+            if wait is not None:
+                return wait if wait <= self.max_backoff else None
+        wait = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        if self.jitter:
+            wait *= self.random()
+        return wait
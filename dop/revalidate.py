@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+dop.revalidate
+~~~~~~~~~~~~~~
+
+This module implements the revalidation of responses the client already
+has: unchanged responses are detected, with conditional requests when the
+server supports them and by hashing the body otherwise, and are not parsed
+again.
+
+Basic usage:
+
+   >>> from dop.client import Client
+   >>> client = Client('client_id', 'api_key', revalidate=True)
+   >>> client.droplets()  # parsed
+   >>> client.droplets()  # unchanged: same Droplet objects, nothing parsed
+   >>> client.stats()['revalidation']
+   {'not_modified': 0, 'unchanged': 1, 'changed': 1, 'models_reused': 1,
+    'entries': 1}
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class _Entry(object):
+
+    def __init__(self, json, digest, etag, last_modified):
+        self.json = json
+        self.digest = digest
+        self.etag = etag
+        self.last_modified = last_modified
+        self.models = {}
+
+
+class Revalidator(object):
+    """
+    Remembers the last response of every GET request, by cache key, with
+    its ETag, Last-Modified and a hash of its body.
+
+    When the server answers 304 Not Modified, or sends a body identical to
+    the previous one, the previous JSON document is returned as is, and
+    model lists built from it are reused. The least recently used responses
+    are dropped once ``max_entries`` is reached.
+
+    Every method is safe to call from several threads.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.not_modified = 0
+        self.unchanged = 0
+        self.changed = 0
+        self.models_reused = 0
+        self._entries = OrderedDict()
+        self._by_json = {}
+        self._lock = threading.Lock()
+
+    def conditional_headers(self, key):
+        """
+        Returns the headers making the request for key conditional.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def not_modified_json(self, key):
+        """
+        Returns the JSON document to use after a 304 response for key, or
+        None if it has been dropped meanwhile.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.not_modified += 1
+            return entry.json
+
+    def update(self, key, response, decode):
+        """
+        Returns the JSON document of a 200 response for key: the previous
+        one if the body did not change, decode(body) otherwise.
+        """
+        body = response.content
+        digest = hashlib.sha1(body).digest()
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.digest == digest:
+                entry.etag = etag
+                entry.last_modified = last_modified
+                self._entries.move_to_end(key)
+                self.unchanged += 1
+                return entry.json
+        json = decode(body)
+        entry = _Entry(json, digest, etag, last_modified)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._by_json.pop(id(previous.json), None)
+            self._entries[key] = entry
+            self._by_json[id(json)] = entry
+            while len(self._entries) > self.max_entries:
+                _, dropped = self._entries.popitem(last=False)
+                self._by_json.pop(id(dropped.json), None)
+            self.changed += 1
+        return json
+
+    def models(self, json, key, model):
+        """
+        Returns the list of model objects built from json[key]. The objects
+        are built once per response and shared by every later call given
+        the same, unchanged, JSON document.
+        """
+        with self._lock:
+            entry = self._by_json.get(id(json))
+            if entry is not None and entry.json is json:
+                models = entry.models.get(key)
+                if models is not None:
+                    self.models_reused += 1
+                    return list(models)
+        models = [model.from_json(item) for item in json.get(key, [])]
+        if entry is not None:
+            with self._lock:
+                entry.models[key] = models
+        return list(models)
+
+    def stats(self):
+        with self._lock:
+            return {'not_modified': self.not_modified,
+                    'unchanged': self.unchanged, 'changed': self.changed,
+                    'models_reused': self.models_reused,
+                    'entries': len(self._entries)}
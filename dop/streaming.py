@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+dop.streaming
+~~~~~~~~~~~~~
+
+This module implements an incremental parser for the list responses of the
+API, so their items can be used while the rest of the body is still being
+downloaded.
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import codecs
+import json
+import re
+
+from .exceptions import DOPException
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*')
+# Characters that may continue a number after what has been decoded of it.
+_number_tail = frozenset('0123456789.eE+-')
+
+
+class _Stream(object):
+    """
+    Text read from an iterable of byte chunks. Only the part that has not
+    been decoded yet is kept in memory.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            raise DOPException('Unexpected end of JSON response')
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        try:
+            for chunk in self.chunks:
+                text = self.decoder.decode(chunk)
+                if text:
+                    self.buffer += text
+                    return
+            self.buffer += self.decoder.decode(b'', final=True)
+        except UnicodeDecodeError as e:
+            raise DOPException('Invalid JSON response: %s' % e)
+        self.eof = True
+
+    def peek(self):
+        """
+        Skips whitespace and returns the next character.
+        """
+        while True:
+            self.pos = _whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            self.fill()
+
+    def next(self):
+        char = self.peek()
+        self.pos += 1
+        return char
+
+    def expect(self, char):
+        found = self.next()
+        if found != char:
+            raise DOPException('Invalid JSON response: expected %r, found %r'
+                               % (char, found))
+
+    def value(self):
+        """
+        Decodes the next JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if self.eof:
+                    raise DOPException('Invalid JSON response')
+                self.fill()
+                continue
+            # A number at the end of the buffer, or followed by what may be
+            # its fraction or exponent, may continue in the next chunk, so a
+            # value only counts once something else follows it.
+            if self.eof or (end < len(self.buffer) and
+                            self.buffer[end] not in _number_tail):
+                self.pos = end
+                return value
+            self.fill()
+
+
+def iter_json_array(chunks, key, members=None):
+    """
+    Reads a JSON object from an iterable of byte chunks and yields the items
+    of its ``key`` array one at a time as soon as they are decoded. The other
+    members of the object are stored in the ``members`` dict if given.
+    """
+    if members is None:
+        members = {}
+    stream = _Stream(chunks)
+    stream.expect('{')
+    if stream.peek() == '}':
+        return
+    while True:
+        name = stream.value()
+        stream.expect(':')
+        if name == key and stream.peek() == '[':
+            stream.expect('[')
+            if stream.peek() == ']':
+                stream.expect(']')
+            else:
+                while True:
+                    yield stream.value()
+                    separator = stream.next()
+                    if separator == ']':
+                        break
+                    if separator != ',':
+                        raise DOPException('Invalid JSON response: expected '
+                                           "',' or ']', found %r" % separator)
+        else:
+            members[name] = stream.value()
+        separator = stream.next()
+        if separator == '}':
+            return
+        if separator != ',':
+            raise DOPException("Invalid JSON response: expected ',' or '}', "
+                               'found %r' % separator)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+dop.transport
+~~~~~~~~~~~~~
+
+This module implements the HTTP transport used by the client. A transport
+keeps a pool of keep-alive connections to the API host so consecutive calls
+reuse the same TCP+TLS connection instead of opening a new one every time,
+and asks for compressed responses.
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import threading
+
+from .exceptions import TransportError
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+ACCEPT_ENCODING = 'gzip, deflate'
+
+
+def wire_size(response):
+    """
+    Returns the number of bytes of the body of response read from the
+    network so far, before decompression, or None if unknown.
+    """
+    try:
+        return response.raw.tell()
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class HTTPTransport(object):
+    """
+    Connection-pooled transport backed by a ``requests.Session``. The
+    session, and requests itself, are only loaded by the first request.
+
+    Optional parameters:
+
+        pool_connections:
+            Integer, number of per-host connection pools to keep around.
+
+        pool_maxsize:
+            Integer, maximum number of connections kept open to a single
+            host. Use at least as many as threads sharing the transport.
+
+        pool_block:
+            Boolean, when set a caller waits for a free connection instead of
+            opening an extra one once ``pool_maxsize`` is reached.
+
+        keep_alive:
+            Boolean, when disabled every response closes its connection.
+
+        compress:
+            Boolean, when set gzip or deflate encoded responses are asked
+            for. They are decompressed as they are read, chunk by chunk.
+
+    The transport counts the responses it received and their body bytes
+    before and after decompression, see stats().
+    """
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False,
+                 keep_alive=True, compress=True):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.compress = compress
+        self.session = None
+        self.closed = False
+        self.responses = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self._lock = threading.Lock()
+
+    def create_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize,
+                              pool_block=self.pool_block)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        session.headers['Accept-Encoding'] = \
+            ACCEPT_ENCODING if self.compress else 'identity'
+        return session
+
+    def send(self, method, url, headers=None, params=None, stream=False,
+             timeout=None):
+        """
+        Sends a request and returns the response. With stream the body is
+        left unread, to be consumed with ``response.iter_content()``.
+        timeout is either a number or a (connect, read) tuple of seconds.
+        """
+        session = self.session or self._open()
+        import requests
+        try:
+            response = session.request(method, url, headers=headers,
+                                       params=params, stream=stream,
+                                       timeout=timeout)
+        except requests.RequestException as e:
+            connect_failed = isinstance(e, requests.ConnectTimeout)
+            raise TransportError('Connection error: %s' % e, connect_failed)
+        if not stream:
+            self._count(response, len(response.content))
+        return response
+
+    def iter_content(self, response, chunk_size):
+        """
+        Yields the body of a streamed response in chunks of bytes.
+        """
+        import requests
+        decoded = 0
+        try:
+            for chunk in response.iter_content(chunk_size):
+                decoded += len(chunk)
+                yield chunk
+        except requests.RequestException as e:
+            raise TransportError('Connection error: %s' % e)
+        finally:
+            # Also when the reader stops early, e.g. once the list ended.
+            self._count(response, decoded)
+
+    def _count(self, response, decoded):
+        wire = wire_size(response)
+        with self._lock:
+            self.responses += 1
+            self.wire_bytes += decoded if wire is None else wire
+            self.decoded_bytes += decoded
+
+    def stats(self):
+        """
+        Returns the number of responses and their body bytes as received
+        (wire_bytes) and once decompressed (decoded_bytes).
+        """
+        with self._lock:
+            return {'responses': self.responses,
+                    'wire_bytes': self.wire_bytes,
+                    'decoded_bytes': self.decoded_bytes}
+
+    def _open(self):
+        with self._lock:
+            if self.closed:
+                raise RuntimeError('transport is closed')
+            if self.session is None:
+                self.session = self.create_session()
+            return self.session
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+dop.waiter
+~~~~~~~~~~
+
+This module implements a waiter that polls many events until they are done.
+
+Basic usage:
+
+   >>> from dop.waiter import EventWaiter
+   >>> results = client.reboot_droplets(droplet_ids)
+   >>> event_ids = [r for r in results.values() if isinstance(r, int)]
+   >>> events = EventWaiter(client).wait(event_ids, timeout=600)
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import time
+
+from .catalogue import is_id
+from .client import DOPException
+from .workers import DEFAULT_MAX_WORKERS, imap_bounded
+
+DONE = 'done'
+
+
+class _PendingEvent(object):
+
+    def __init__(self, event_id, interval, now):
+        self.event_id = event_id
+        self.interval = interval
+        self.next_poll = now
+        self.percentage = None
+        self.polled_at = None
+        self.errors = 0
+
+
+class EventWaiter(object):
+    """
+    Polls a set of events until every one of them is done.
+
+    Each round only the events that are due are fetched, concurrently. The
+    delay before an event is polled again follows its progress: the rate at
+    which ``Event.percentage`` grows gives an estimate of the remaining time
+    and the event is checked again halfway through it. Events that make no
+    progress back off exponentially, and finished events are not polled
+    again.
+
+    Optional parameters:
+
+        min_interval:
+            Number, minimum seconds between two polls of the same event.
+
+        max_interval:
+            Number, maximum seconds between two polls of the same event.
+
+        max_errors:
+            Integer, consecutive DOPException after which an event is given
+            up and the exception is returned as its result.
+
+        max_workers:
+            Integer, maximum number of events fetched at once.
+    """
+
+    def __init__(self, client, min_interval=1.0, max_interval=30.0,
+                 max_errors=3, max_workers=DEFAULT_MAX_WORKERS,
+                 clock=time.time, sleep=time.sleep):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_errors = max_errors
+        self.max_workers = max_workers
+        self.clock = clock
+        self.sleep = sleep
+
+    def wait(self, event_ids, timeout=None):
+        """
+        This method blocks until all the events are done and returns a dict
+        mapping every event_id to its final Event, or to the DOPException
+        that made the waiter give it up. Values that are not event ids, such
+        as the DOPException a bulk action returns for a failed droplet, are
+        skipped.
+
+        Optional parameters
+
+            timeout:
+                Number, seconds after which a DOPException is raised if some
+                events are still running. Waits forever by default.
+        """
+        now = self.clock()
+        deadline = None if timeout is None else now + timeout
+        pending = dict((event_id, _PendingEvent(event_id, self.min_interval, now))
+                       for event_id in event_ids if is_id(event_id))
+        results = {}
+
+        while pending:
+            now = self.clock()
+            due = [event_id for event_id, state in pending.items()
+                   if state.next_poll <= now]
+            polled = imap_bounded(self.client.events, due, self.max_workers,
+                                  errors=(DOPException,))
+            for event_id, event in polled:
+                state = pending[event_id]
+                if self._update(state, event, self.clock()):
+                    results[event_id] = event
+                    del pending[event_id]
+
+            if not pending:
+                break
+            wake_up = min(state.next_poll for state in pending.values())
+            now = self.clock()
+            if deadline is not None:
+                if now >= deadline:
+                    ids = ', '.join(str(i) for i in sorted(pending, key=str))
+                    raise DOPException('Timed out waiting for events: %s' % ids)
+                wake_up = min(wake_up, deadline)
+            if wake_up > now:
+                self.sleep(wake_up - now)
+        return results
+
+    def _update(self, state, event, now):
+        """
+        Schedules the next poll of an event and tells whether it is finished.
+        """
+        if isinstance(event, DOPException):
+            state.errors += 1
+            if state.errors >= self.max_errors:
+                return True
+            state.interval = min(state.interval * 2, self.max_interval)
+            state.next_poll = now + state.interval
+            return False
+        state.errors = 0
+        if event.action_status == DONE:
+            return True
+
+        try:
+            percentage = float(event.percentage or 0)
+        except (TypeError, ValueError):
+            percentage = 0.0
+        if state.polled_at is not None and percentage > state.percentage:
+            rate = (percentage - state.percentage) / max(now - state.polled_at,
+                                                         1e-3)
+            remaining = max(100.0 - percentage, 0.0) / rate
+            interval = remaining / 2
+        else:
+            interval = state.interval * 2
+        state.interval = max(self.min_interval, min(interval, self.max_interval))
+        state.percentage = percentage
+        state.polled_at = now
+        state.next_poll = now + state.interval
+        return False
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+dop.workers
+~~~~~~~~~~~
+
+This module implements the bounded worker pool used to fan out many API
+calls at once.
+
+:license: MIT, see LICENSE for more details.
+
+"""
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def imap_bounded(func, items, max_workers=DEFAULT_MAX_WORKERS,
+                 errors=(Exception,)):
+    """
+    Calls ``func(item)`` for every item on at most ``max_workers`` threads and
+    yields ``(item, result)`` pairs as each call completes.
+
+    When a call raises one of ``errors`` the exception instance is yielded as
+    its result instead of aborting the remaining calls.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    items = list(items)
+    if not items:
+        return
+    workers = max(1, min(max_workers, len(items)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = dict((executor.submit(func, item), item) for item in items)
+        try:
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except errors as e:
+                    result = e
+                yield futures[future], result
+        finally:
+            # Do not start the calls still queued if the caller stops early.
+            for future in futures:
+                future.cancel()
+
+
+def map_bounded(func, items, max_workers=DEFAULT_MAX_WORKERS,
+                errors=(Exception,)):
+    """
+    Same as ``imap_bounded`` but waits for every call and returns a dict
+    mapping each item to its result.
+    """
+    return dict(imap_bounded(func, items, max_workers, errors))
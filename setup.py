@@ -1,13 +1,20 @@
 #!/usr/bin/env python
 
+import re
+
 try:
     from setuptools import setup
 except ImportError:
     from distutils.core import setup
 
+# Read the version without importing dop, whose dependencies may not be
+# installed yet.
+with open('dop/__init__.py') as f:
+    version = re.search(r"^__version__ = '([^']+)'", f.read(), re.M).group(1)
+
 setup(
     name='dop',
-    version='1.6.b6',
+    version=version,
     description="A Python client for the Digital Ocean API",
     long_description=open('README.rst').read() + '\n\n' +
                      open('CHANGES.txt').read(),
@@ -19,6 +26,7 @@ setup(
     package_dir={'dop': 'dop'},
     include_package_data=True,
     install_requires=["requests >= 1.0.4", "pycrypto >= 2.6.1"],
+    python_requires='>=3.5',
     license=open('LICENSE.txt').read(),
     zip_safe=False,
     classifiers=(
@@ -28,9 +36,7 @@ setup(
         'License :: OSI Approved :: MIT License',
         'Topic :: Internet :: WWW/HTTP',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 2.6',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.0',
+        'Programming Language :: Python :: 3 :: Only',
     ),
 )
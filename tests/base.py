@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Base test case running every test against its own local fake API.
+"""
+
+import unittest
+
+from benchmarks.fakeapi import FakeAPI
+
+
+class FakeAPITestCase(unittest.TestCase):
+    """
+    Starts a FakeAPI server with api_options before every test, available
+    as self.api, and a Client talking to it with client_options as
+    self.client. Both are stopped once the test is over.
+
+    Test cases whose tests need differently configured servers set
+    autostart to False and call start() themselves.
+    """
+
+    api_options = {'droplets': 5, 'domains': 1}
+    client_options = {}
+    autostart = True
+
+    def setUp(self):
+        if self.autostart:
+            self.start()
+
+    def start(self, **options):
+        """
+        Starts a server with api_options updated with options and returns
+        it, after setting self.api and self.client.
+        """
+        kwargs = dict(self.api_options)
+        kwargs.update(options)
+        self.api = FakeAPI(**kwargs).start()
+        self.addCleanup(self.api.stop)
+        self.client = self.new_client()
+        return self.api
+
+    def new_client(self, **options):
+        """
+        Returns another Client talking to self.api, created with
+        client_options updated with options.
+        """
+        kwargs = dict(self.client_options)
+        kwargs.update(options)
+        client = self.api.client(**kwargs)
+        self.addCleanup(client.close)
+        return client
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+AsyncClient against the local fake API.
+"""
+
+import asyncio
+import inspect
+import unittest
+
+from dop.aio import ENDPOINTS, ITERATORS, LOCAL_METHODS, AsyncClient
+from dop.client import Client
+from tests.base import FakeAPITestCase
+
+
+class AsyncClientTest(FakeAPITestCase):
+
+    api_options = {'droplets': 20, 'domains': 3}
+
+    def run_async(self, coroutine):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        return loop.run_until_complete(coroutine)
+
+    def async_client(self, **kwargs):
+        return AsyncClient('fake_client_id', 'fake_api_key', host='127.0.0.1',
+                           port=self.api.port, secure=False, **kwargs)
+
+    def test_every_public_method_is_exposed(self):
+        for name, _ in inspect.getmembers(Client, inspect.isfunction):
+            if name.startswith('_') or name in LOCAL_METHODS:
+                continue
+            self.assertIn(name, ENDPOINTS + ITERATORS)
+            self.assertTrue(hasattr(AsyncClient, name), name)
+        for name in ENDPOINTS:
+            self.assertTrue(inspect.iscoroutinefunction(
+                getattr(AsyncClient, name)), name)
+
+    def test_coroutines(self):
+        async def main():
+            async with self.async_client(concurrency=4) as client:
+                droplets = await client.droplets()
+                shown = await asyncio.gather(*[
+                    client.show_droplet(d.droplet_id) for d in droplets])
+                rebooted = await client.reboot_droplets([1, 2, 999])
+                return droplets, shown, rebooted
+        droplets, shown, rebooted = self.run_async(main())
+        self.assertEqual([d.droplet_id for d in shown],
+                         [d.droplet_id for d in droplets])
+        self.assertEqual(sorted(rebooted), [1, 2, 999])
+
+    def test_async_iterators(self):
+        async def main():
+            async with self.async_client() as client:
+                droplets = []
+                async for droplet in client.iter_droplets():
+                    droplets.append(droplet)
+                domains = []
+                async for domain_id, records in \
+                        client.iter_all_domain_records():
+                    domains.append(domain_id)
+                return droplets, domains
+        droplets, domains = self.run_async(main())
+        self.assertEqual(len(droplets), 20)
+        self.assertEqual(sorted(domains), [1, 2, 3])
+
+    def test_closing_does_not_block_the_loop(self):
+        api = self.start(latency=0.3)
+        ticks = []
+        closed = []
+
+        async def ticker():
+            while not closed:
+                ticks.append(None)
+                await asyncio.sleep(0.01)
+
+        async def main():
+            client = self.async_client()
+            pending = asyncio.ensure_future(client.show_droplet(1))
+            await asyncio.sleep(0.05)
+            ticking = asyncio.ensure_future(ticker())
+            await client.aclose()
+            closed.append(None)
+            await ticking
+            return await pending
+        droplet = self.run_async(main())
+        self.assertEqual(droplet.droplet_id, 1)
+        self.assertGreater(len(ticks), 5)
+        self.assertEqual(api.requests, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
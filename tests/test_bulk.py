@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk droplet actions against the local fake API.
+"""
+
+import unittest
+
+from dop.exceptions import DOPException
+from tests.base import FakeAPITestCase
+
+
+class BulkTest(FakeAPITestCase):
+
+    def test_results_per_droplet(self):
+        results = self.client.reboot_droplets([1, 2, 999])
+        self.assertEqual(sorted(results), [1, 2, 999])
+        self.assertIsInstance(results[999], DOPException)
+        self.assertNotIsInstance(results[1], DOPException)
+
+    def test_duplicates_are_acted_on_once(self):
+        results = self.client.reboot_droplets([1, 1, 2, 999, 2])
+        self.assertEqual(sorted(results), [1, 2, 999])
+        self.assertEqual(self.api.requests, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
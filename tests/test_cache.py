@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Response caches, alone and plugged into a client against the local fake API.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from dop.cache import SQLiteCache, TTLCache
+from tests.base import FakeAPITestCase
+
+
+class CacheCountersTest(FakeAPITestCase):
+
+    def setUp(self):
+        super(CacheCountersTest, self).setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.filename = os.path.join(directory, 'dop.cache')
+
+    def check_counters(self, cache, coalesce):
+        client = self.new_client(cache=cache, coalesce=coalesce)
+        client.regions()
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.stats()['hits'], 0)
+        client.regions()
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(self.api.requests, 1)
+
+    def test_ttl_cache(self):
+        self.check_counters(TTLCache(), coalesce=False)
+
+    def test_ttl_cache_coalesced(self):
+        self.check_counters(TTLCache(), coalesce=True)
+
+    def test_sqlite_cache_coalesced(self):
+        cache = SQLiteCache(self.filename)
+        self.addCleanup(cache.close)
+        self.check_counters(cache, coalesce=True)
+
+    def test_peek_does_not_count(self):
+        cache = TTLCache()
+        cache.set('/regions', {'status': 'OK'})
+        self.assertEqual(cache.peek('/regions'), {'status': 'OK'})
+        self.assertIsNone(cache.peek('/sizes'))
+        self.assertEqual(cache.stats()['hits'], 0)
+        self.assertEqual(cache.stats()['misses'], 0)
+
+
+class SQLiteCacheTest(FakeAPITestCase):
+
+    autostart = False
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.filename = os.path.join(directory, 'dop.cache')
+        self.now = 1000.0
+        self.cache = SQLiteCache(self.filename, timeout=0.1,
+                                 clock=lambda: self.now)
+        self.addCleanup(self.cache.close)
+        self.db = sqlite3.connect(self.filename, isolation_level=None)
+        self.addCleanup(self.db.close)
+
+    def accessed(self, key):
+        return self.db.execute('SELECT accessed FROM entries WHERE key = ?',
+                               (key,)).fetchone()[0]
+
+    def test_access_time_is_updated_sparingly(self):
+        self.cache.set('/regions', {'status': 'OK'})
+        self.now += 1
+        self.assertEqual(self.cache.get('/regions'), {'status': 'OK'})
+        self.assertEqual(self.accessed('/regions'), 1000.0)
+        self.now += self.cache.touch_interval
+        self.cache.get('/regions')
+        self.assertEqual(self.accessed('/regions'), self.now)
+
+    def test_hits_while_another_process_writes(self):
+        self.cache.set('/regions', {'status': 'OK'})
+        self.db.execute('BEGIN IMMEDIATE')
+        self.addCleanup(self.db.execute, 'ROLLBACK')
+        self.assertEqual(self.cache.get('/regions'), {'status': 'OK'})
+        self.cache.set('/sizes', {'status': 'OK'})
+        self.assertIsNone(self.cache.get('/sizes'))
+
+    def test_errors_are_misses(self):
+        self.db.execute('DROP TABLE entries')
+        api = self.start()
+        client = self.new_client(cache=self.cache)
+        self.assertEqual(len(client.regions()), len(client.regions()))
+        self.assertEqual(api.requests, 2)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertIsNone(self.cache.stats()['entries'])
+
+    def test_errors_do_not_fail_actions(self):
+        self.db.execute('DROP TABLE entries')
+        self.start()
+        client = self.new_client(cache=self.cache)
+        self.assertIsNotNone(client.snapshot_droplet(1, 'backup'))
+        self.cache.invalidate()
+        results = client.snapshot_droplets([1, 2], 'backup')
+        self.assertEqual(sorted(results), [1, 2])
+        for event_id in results.values():
+            self.assertIsInstance(event_id, int)
+
+
+if __name__ == '__main__':
+    unittest.main()
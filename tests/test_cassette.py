@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Recording a cassette against the local fake API and replaying it offline.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from dop.cassette import SCRUBBED, ReplayTransport
+from dop.client import Client
+from dop.exceptions import DOPException
+from tests.base import FakeAPITestCase
+
+
+class CassetteTest(FakeAPITestCase):
+
+    def setUp(self):
+        super(CassetteTest, self).setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.filename = os.path.join(directory, 'run.jsonl')
+
+    def record(self):
+        client = self.new_client(client_id='secret-id', api_key='secret-key',
+                                 cassette=self.filename)
+        with client:
+            droplets = client.droplets()
+            # The body echoes the name, and with it the credentials.
+            created = client.create_droplet(
+                'secret-id-secret-key', size={'size_slug': '512mb'},
+                image={'image_id': 1}, region={'region_slug': 'nyc1'})
+            shown = client.show_droplet(1)
+        self.api.stop()
+        return droplets, created, shown
+
+    def replay_client(self, **kwargs):
+        # Nothing listens there: every response must come from the cassette.
+        return Client('other-id', 'other-key', host='127.0.0.1', port=1,
+                      secure=False, cassette=self.filename, **kwargs)
+
+    def test_round_trip(self):
+        droplets, created, shown = self.record()
+        with open(self.filename) as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual(len(entries), 3)
+        for entry in entries:
+            self.assertNotIn('client_id', entry['query'])
+            self.assertNotIn('api_key', entry['query'])
+            self.assertNotIn('secret-id', entry['body'])
+            self.assertNotIn('secret-key', entry['body'])
+        self.assertIn(SCRUBBED, entries[1]['body'])
+
+        with self.replay_client() as client:
+            self.assertIsInstance(client.transport, ReplayTransport)
+            self.assertEqual([d.droplet_id for d in client.droplets()],
+                             [d.droplet_id for d in droplets])
+            self.assertEqual([d.name for d in client.iter_droplets()],
+                             [d.name for d in droplets])
+            replayed = client.create_droplet(
+                'secret-id-secret-key', size={'size_slug': '512mb'},
+                image={'image_id': 1}, region={'region_slug': 'nyc1'})
+            self.assertEqual(replayed.droplet_id, created.droplet_id)
+            self.assertEqual(replayed.name, '%s-%s' % (SCRUBBED, SCRUBBED))
+            self.assertEqual(client.show_droplet(1).name, shown.name)
+
+    def test_missing_request(self):
+        self.record()
+        with self.replay_client() as client:
+            with self.assertRaises(DOPException) as raised:
+                client.show_droplet(2)
+            self.assertIn('/droplets/2', str(raised.exception))
+
+    def test_used_up(self):
+        self.record()
+        transport = ReplayTransport(self.filename, repeat=False)
+        client = Client('other-id', 'other-key', host='127.0.0.1', port=1,
+                        secure=False, transport=transport)
+        client.show_droplet(1)
+        self.assertRaises(DOPException, client.show_droplet, 1)
+        transport.rewind()
+        self.assertEqual(client.show_droplet(1).droplet_id, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Request coalescing.
+"""
+
+import threading
+import unittest
+
+from dop.coalesce import SingleFlight
+from dop.exceptions import DOPException
+from tests.base import FakeAPITestCase
+
+CALLERS = 8
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def run_callers(self, flight, func):
+        """
+        Calls flight.do('key', func) from CALLERS threads, all arriving
+        while the first call is still running, and returns their outcomes.
+        """
+        outcomes = []
+        lock = threading.Lock()
+
+        def caller():
+            try:
+                outcome = flight.do('key', func)
+            except Exception as e:
+                outcome = e
+            with lock:
+                outcomes.append(outcome)
+
+        threads = [threading.Thread(target=caller) for _ in range(CALLERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        return outcomes
+
+    def blocking(self, result=None, error=None):
+        """
+        Returns a function that counts its calls and waits for every caller
+        to have joined the flight before returning result or raising error.
+        """
+        self.calls = 0
+        flight = self.flight
+
+        def func():
+            self.calls += 1
+            while flight.stats()['calls'] < CALLERS:
+                threading.Event().wait(0.001)
+            if error is not None:
+                raise error
+            return result
+        return func
+
+    def setUp(self):
+        self.flight = SingleFlight()
+
+    def test_one_call_for_concurrent_callers(self):
+        result = object()
+        outcomes = self.run_callers(self.flight, self.blocking(result))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(outcomes), CALLERS)
+        self.assertTrue(all(outcome is result for outcome in outcomes))
+        self.assertEqual(self.flight.stats(),
+                         {'calls': CALLERS, 'collapsed': CALLERS - 1,
+                          'in_flight': 0})
+
+    def test_error_reaches_every_caller(self):
+        error = DOPException('boom')
+        outcomes = self.run_callers(self.flight, self.blocking(error=error))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(outcomes), CALLERS)
+        self.assertTrue(all(outcome is error for outcome in outcomes))
+        self.assertEqual(self.flight.stats()['in_flight'], 0)
+        # The key is released: the next call runs again.
+        self.assertEqual(self.flight.do('key', lambda: 'again'), 'again')
+
+    def test_different_keys_are_not_coalesced(self):
+        self.assertEqual(self.flight.do('a', lambda: 1), 1)
+        self.assertEqual(self.flight.do('b', lambda: 2), 2)
+        self.assertEqual(self.flight.stats()['collapsed'], 0)
+
+
+class CoalescedClientTest(FakeAPITestCase):
+
+    api_options = {'droplets': 5, 'domains': 1, 'latency': 0.2}
+    client_options = {'coalesce': True}
+
+    def test_concurrent_reads_share_one_request(self):
+        threads = [threading.Thread(target=self.client.show_droplet,
+                                    args=(1,)) for _ in range(CALLERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.api.requests, 1)
+
+    def test_actions_are_not_coalesced(self):
+        threads = [threading.Thread(target=self.client.reboot_droplet,
+                                    args=(1,)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.api.requests, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Many threads sharing Client instances against the local fake API.
+"""
+
+import threading
+import unittest
+
+from dop.cache import TTLCache
+from dop.metrics import MetricsCollector
+from dop.transport import HTTPTransport
+from tests.base import FakeAPITestCase
+
+THREADS = 16
+CALLS = 40
+DROPLETS = 50
+DOMAINS = 3
+
+
+def hammer(client, number, failures):
+    for i in range(CALLS):
+        droplet_id = 1 + (number * CALLS + i) % DROPLETS
+        domain_id = 1 + droplet_id % DOMAINS
+        try:
+            kind = i % 4
+            if kind == 0:
+                droplet = client.show_droplet(droplet_id)
+                if droplet.droplet_id != droplet_id:
+                    failures.append('show_droplet(%d) returned droplet %s' %
+                                    (droplet_id, droplet.droplet_id))
+            elif kind == 1:
+                if len(client.droplets()) != DROPLETS:
+                    failures.append('droplets() returned a partial list')
+            elif kind == 2:
+                params = {'filter': 'my_images'}
+                client.request('/images', params=params)
+                if params != {'filter': 'my_images'}:
+                    failures.append('request() modified params: %r' % params)
+            else:
+                records = client.domain_records(domain_id)
+                if any(r.domain_id != domain_id for r in records):
+                    failures.append('domain_records mixed up domains')
+        except Exception as e:
+            failures.append('%s: %s' % (type(e).__name__, e))
+
+
+class SharedClientTest(FakeAPITestCase):
+
+    api_options = {'droplets': DROPLETS, 'domains': DOMAINS}
+
+    def shared_client(self, client_id='fake_client_id',
+                      api_key='fake_api_key', **kwargs):
+        transport = HTTPTransport(pool_maxsize=THREADS, pool_block=True)
+        self.addCleanup(transport.close)
+        return self.new_client(client_id=client_id, api_key=api_key,
+                               transport=transport, **kwargs)
+
+    def run_threads(self, clients):
+        failures = []
+        threads = [threading.Thread(target=hammer,
+                                    args=(clients[n % len(clients)], n,
+                                          failures))
+                   for n in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+
+    def test_request_leaves_params_alone(self):
+        client = self.shared_client()
+        params = {'filter': 'global'}
+        client.request('/images', params=params)
+        client.images()
+        self.assertEqual(params, {'filter': 'global'})
+
+    def test_every_request_sent(self):
+        client = self.shared_client()
+        metrics = MetricsCollector().install(client)
+        self.run_threads([client])
+        sent = sum(endpoint['count'] for endpoint in metrics.as_dict().values())
+        self.assertEqual(sent, THREADS * CALLS)
+        self.assertEqual(self.api.requests, THREADS * CALLS)
+
+    def test_clients_keep_their_credentials(self):
+        first = self.shared_client('first', 'first_key')
+        second = self.shared_client('second', 'second_key')
+        self.run_threads([first, second])
+        self.assertEqual(self.api.credentials,
+                         set([('first', 'first_key'),
+                              ('second', 'second_key')]))
+
+    def test_cache_and_coalescing(self):
+        client = self.shared_client(cache=TTLCache(), coalesce=True)
+        metrics = MetricsCollector().install(client)
+        self.run_threads([client])
+        sent = sum(endpoint['count'] for endpoint in metrics.as_dict().values())
+        self.assertEqual(sent, self.api.requests)
+        self.assertLess(self.api.requests, THREADS * CALLS)
+        self.assertEqual(client.stats()['coalescing']['in_flight'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
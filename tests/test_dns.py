@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Zone synchronisation plans.
+"""
+
+import itertools
+import unittest
+
+from dop.dns import plan_zone
+from dop.exceptions import DOPException
+from dop.models import Record
+
+ids = itertools.count(1)
+
+
+def record(record_type, name, data, priority=None):
+    return Record(next(ids), 1, record_type, name, data, priority, None, None)
+
+
+def desired(record_type, name, data, priority=None):
+    return {'record_type': record_type, 'name': name, 'data': data,
+            'priority': priority}
+
+
+ZONE = [record('NS', '@', 'ns1.digitalocean.com.'),
+        record('NS', '@', 'ns2.digitalocean.com.')]
+
+
+class PlanZoneTest(unittest.TestCase):
+
+    def test_unchanged(self):
+        www = record('A', 'www', '10.0.0.1')
+        plan = plan_zone(1, ZONE + [www], [desired('A', 'www', '10.0.0.1')])
+        self.assertFalse(plan)
+        self.assertEqual(plan.unchanged, [www])
+
+    def test_zone_records_are_kept(self):
+        plan = plan_zone(1, ZONE + [record('A', 'old', '10.0.0.9')],
+                         [desired('A', 'www', '10.0.0.1'),
+                          desired('MX', '@', 'mx.example.com.', 10)])
+        self.assertEqual([r['name'] for r in plan.create], ['www', '@'])
+        self.assertEqual([r.name for r in plan.delete], ['old'])
+
+    def test_zone_records_managed_when_listed(self):
+        plan = plan_zone(1, ZONE, [desired('NS', '@', 'ns1.digitalocean.com.')],
+                         record_types=('NS',))
+        self.assertEqual(plan.delete, [ZONE[1]])
+        self.assertRaises(DOPException, plan_zone, 1, ZONE,
+                          [desired('NS', '@', 'ns.example.com.')])
+
+    def test_stale_record_is_edited(self):
+        www = record('A', 'www', '10.0.0.1')
+        plan = plan_zone(1, [www], [desired('A', 'www', '10.0.0.2')])
+        self.assertEqual(plan.create, [])
+        self.assertEqual(plan.delete, [])
+        self.assertEqual(len(plan.update), 1)
+        current, wanted = plan.update[0]
+        self.assertIs(current, www)
+        self.assertEqual(wanted['data'], '10.0.0.2')
+
+    def test_changed_option_is_edited(self):
+        mx = record('MX', '@', 'mx.example.com.', 10)
+        plan = plan_zone(1, [mx], [desired('MX', '@', 'mx.example.com.', 20)])
+        self.assertEqual([current for current, _ in plan.update], [mx])
+        plan = plan_zone(1, [mx], [desired('MX', '@', 'mx.example.com.')])
+        self.assertEqual(plan.unchanged, [mx])
+
+    def test_duplicate_records(self):
+        first = record('A', 'www', '10.0.0.1')
+        second = record('A', 'www', '10.0.0.1')
+        plan = plan_zone(1, [first, second], [desired('A', 'www', '10.0.0.1')])
+        self.assertEqual(plan.unchanged, [first])
+        self.assertEqual(plan.delete, [second])
+
+        plan = plan_zone(1, [first], [desired('A', 'www', '10.0.0.1')] * 2)
+        self.assertEqual(plan.unchanged, [first])
+        self.assertEqual(len(plan.create), 1)
+
+    def test_record_types(self):
+        a = record('A', 'www', '10.0.0.1')
+        txt = record('TXT', '@', 'v=spf1 -all')
+        plan = plan_zone(1, [a, txt], [], record_types=('A',))
+        self.assertEqual(plan.delete, [a])
+        self.assertRaises(DOPException, plan_zone, 1, [a, txt],
+                          [desired('TXT', '@', 'v=spf1 ~all')],
+                          record_types=('A',))
+
+    def test_no_prune(self):
+        old = record('A', 'old', '10.0.0.9')
+        www = record('A', 'www', '10.0.0.1')
+        plan = plan_zone(1, [old, www], [desired('A', 'www', '10.0.0.2')],
+                         prune=False)
+        self.assertEqual(plan.delete, [])
+        self.assertEqual(plan.update, [])
+        self.assertEqual([r['data'] for r in plan.create], ['10.0.0.2'])
+
+
+class RecordingClient(object):
+    """
+    Records the changes applied by a plan, failing those on failing names.
+    """
+
+    def __init__(self, failing=()):
+        self.failing = failing
+        self.calls = []
+
+    def _call(self, operation, name):
+        self.calls.append((operation, name))
+        if name in self.failing:
+            raise DOPException('[ERROR]: %s %s' % (operation, name))
+
+    def create_domain_record(self, domain_id, record_type, data, name=None,
+                             **kwargs):
+        self._call('create', name)
+
+    def edit_domain_record(self, domain_id, record_id, record_type, data,
+                           name=None, **kwargs):
+        self._call('update', name)
+
+    def destroy_domain_record(self, domain_id, record_id):
+        self._call('delete', [r.name for r in self.current
+                              if r.record_id == record_id][0])
+
+
+class ApplyTest(unittest.TestCase):
+
+    def test_errors_are_collected(self):
+        current = [record('A', 'www', '10.0.0.1'), record('A', 'old', '10.0.0.9'),
+                   record('CNAME', 'gone', 'www')]
+        plan = plan_zone(1, current, [desired('A', 'www', '10.0.0.2'),
+                                      desired('A', 'new', '10.0.0.3'),
+                                      desired('A', 'api', '10.0.0.4')])
+        client = RecordingClient(failing=('new', 'gone'))
+        client.current = current
+        plan.apply(client, max_workers=2)
+        self.assertEqual(sorted(client.calls),
+                         [('create', 'api'), ('create', 'new'),
+                          ('delete', 'gone'), ('delete', 'old'),
+                          ('update', 'www')])
+        # Deletes only start once the creates and edits are done.
+        self.assertEqual([op for op, _ in client.calls[-2:]],
+                         ['delete', 'delete'])
+        self.assertEqual(sorted(op for op, _ in plan.errors),
+                         ['create', 'delete'])
+        for _, error in plan.errors:
+            self.assertIsInstance(error, DOPException)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Fleet inventory polls against the local fake API.
+"""
+
+import unittest
+
+from dop.exceptions import DOPException
+from dop.inventory import Inventory
+from tests.base import FakeAPITestCase
+
+
+class InventoryTest(FakeAPITestCase):
+
+    def setUp(self):
+        super(InventoryTest, self).setUp()
+        self.inventory = Inventory(self.client)
+        self.notified = []
+        self.inventory.subscribe(self.notified.append)
+        self.first = self.inventory.poll()
+
+    def ids(self, droplets):
+        return sorted(droplet.droplet_id for droplet in droplets)
+
+    def test_first_poll(self):
+        self.assertEqual(self.ids(self.first.added), [1, 2, 3, 4, 5])
+        self.assertEqual((self.first.removed, self.first.changed), ([], {}))
+        self.assertEqual(self.notified, [self.first])
+
+    def test_unchanged_poll(self):
+        changes = self.inventory.poll()
+        self.assertFalse(changes)
+        self.assertEqual(len(self.notified), 1)
+        self.assertEqual(self.inventory.get(1).name, 'droplet-1')
+
+    def test_change_set(self):
+        self.api.droplets[1]['status'] = 'off'
+        self.api.droplets[1]['ip_address'] = None
+        self.api.droplets[2]['name'] = 'renamed'
+        del self.api.droplets[3]
+        self.api.droplets[6] = self.api._droplet(6, 'droplet-6', 1, 66, 1,
+                                                 status='active')
+        changes = self.inventory.poll()
+        self.assertEqual(self.ids(changes.added), [6])
+        self.assertEqual(self.ids(changes.removed), [3])
+        self.assertEqual(changes.removed[0].name, 'droplet-3')
+        self.assertEqual(changes.changed, {
+            1: {'status': ('active', 'off'),
+                'ip_address': ('192.0.0.1', None)},
+            2: {'name': ('droplet-2', 'renamed')},
+        })
+        self.assertEqual(self.notified, [self.first, changes])
+
+    def test_indexes_follow_changes(self):
+        self.assertEqual(self.ids(self.inventory.find(region_id=2)), [1, 5])
+        self.api.droplets[1]['region_id'] = 3
+        self.api.droplets[5]['status'] = 'off'
+        del self.api.droplets[2]
+        self.inventory.poll()
+        self.assertEqual(self.ids(self.inventory.find(region_id=2)), [5])
+        self.assertEqual(self.ids(self.inventory.find(region_id=3)), [1])
+        self.assertEqual(self.ids(self.inventory.find(status='off')), [5])
+        self.assertEqual(self.ids(self.inventory.find(status='active')),
+                         [1, 3, 4])
+        self.assertEqual(self.inventory.find(name='droplet-2'), [])
+
+    def test_find_combined_criteria(self):
+        self.api.droplets[5]['status'] = 'off'
+        self.inventory.poll()
+        self.assertEqual(
+            self.ids(self.inventory.find(region_id=2, status='active')), [1])
+        self.assertEqual(
+            self.ids(self.inventory.find(region_id=2, status='off',
+                                         name='droplet-5')), [5])
+        self.assertEqual(self.inventory.find(region_id=4, status='off'), [])
+        self.assertEqual(self.ids(self.inventory.find()), [1, 2, 3, 4, 5])
+        self.assertRaises(DOPException, self.inventory.find, size_id=66)
+
+    def test_unsubscribe(self):
+        self.inventory.unsubscribe(self.notified.append)
+        self.api.droplets[1]['name'] = 'renamed'
+        self.assertTrue(self.inventory.poll())
+        self.assertEqual(self.notified, [self.first])
+
+    def test_api_errors(self):
+        inventory = Inventory(self.new_client(api_key=''))
+        self.assertRaises(DOPException, inventory.poll)
+        self.assertEqual(inventory.droplets, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Request metrics against the local fake API.
+"""
+
+import unittest
+
+from dop.exceptions import DOPException
+from dop.metrics import MetricsCollector
+from tests.base import FakeAPITestCase
+
+
+class MetricsTest(FakeAPITestCase):
+
+    def collect(self, client):
+        return MetricsCollector().install(client)
+
+    def test_success(self):
+        metrics = self.collect(self.client)
+        self.client.droplets()
+        droplets = metrics.as_dict()['/droplets']
+        self.assertEqual((droplets['count'], droplets['errors']), (1, 0))
+
+    def test_http_error(self):
+        metrics = self.collect(self.client)
+        self.assertRaises(DOPException, self.client.show_droplet, 999)
+        droplet = metrics.as_dict()['/droplets/:id']
+        self.assertEqual((droplet['count'], droplet['errors']), (1, 1))
+        self.assertEqual(droplet['statuses'], {404: 1})
+
+    def test_api_error(self):
+        # The fake API answers requests without credentials with a 200
+        # whose error_message is Access Denied.
+        client = self.new_client(api_key='')
+        metrics = self.collect(client)
+        self.assertRaises(DOPException, client.droplets)
+        self.assertRaises(DOPException, list, client.iter_droplets())
+        droplets = metrics.as_dict()['/droplets']
+        self.assertEqual((droplets['count'], droplets['errors']), (2, 2))
+        self.assertEqual(droplets['statuses'], {200: 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
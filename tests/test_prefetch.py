@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Catalogue prefetch against the local fake API.
+"""
+
+import threading
+import unittest
+
+from dop.client import PREFETCH_REQUESTS
+from tests.base import FakeAPITestCase
+
+
+class DictCache(object):
+    """
+    Cache with only get, set and invalidate, as a user could supply.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.entries[key] = value
+
+    def invalidate(self, prefix=None):
+        self.entries.clear()
+
+
+class PrefetchTest(FakeAPITestCase):
+
+    api_options = {'droplets': 5, 'domains': 1, 'latency': 0.2}
+
+    def test_first_calls_share_the_prefetch(self):
+        client = self.new_client(prefetch=True)
+        client.regions()
+        client.sizes()
+        client.prefetch(wait=True)
+        self.assertEqual(self.api.requests, len(PREFETCH_REQUESTS))
+        client.images()
+        self.assertEqual(self.api.requests, len(PREFETCH_REQUESTS))
+
+    def test_other_reads_are_not_coalesced(self):
+        client = self.new_client(prefetch=True)
+        client.prefetch(wait=True)
+        threads = [threading.Thread(target=client.show_droplet, args=(1,))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.api.requests, len(PREFETCH_REQUESTS) + 3)
+        self.assertNotIn('coalescing', client.stats())
+
+    def test_cache_without_peek(self):
+        cache = DictCache()
+        client = self.new_client(cache=cache, prefetch=True)
+        client.prefetch(wait=True)
+        self.assertEqual(len(client.regions()), len(client.regions()))
+        self.assertEqual(self.api.requests, len(PREFETCH_REQUESTS))
+
+
+if __name__ == '__main__':
+    unittest.main()
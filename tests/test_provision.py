@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Batch provisioning against the local fake API.
+"""
+
+import time
+import unittest
+
+from dop.exceptions import DOPException
+from tests.base import FakeAPITestCase
+
+
+def spec(name, **kwargs):
+    spec = dict(name=name, size={'size_slug': '512mb'},
+                image={'image_id': 1}, region={'region_slug': 'nyc1'})
+    spec.update(kwargs)
+    return spec
+
+
+class ProvisionTest(FakeAPITestCase):
+
+    def provision(self, specs):
+        return dict((spec['name'], result) for spec, result in
+                    self.client.provision_droplets(specs, timeout=30,
+                                                   poll_interval=0.01))
+
+    def test_every_droplet_is_provisioned(self):
+        results = self.provision([spec('web%d' % i) for i in range(10)])
+        self.assertEqual(len(results), 10)
+        for result in results.values():
+            self.assertEqual(result.status, 'active')
+            self.assertTrue(result.ip_address)
+
+    def test_malformed_specs_do_not_abort_the_batch(self):
+        specs = [spec('web%d' % i) for i in range(10)]
+        specs.append(dict(spec('no-region'), region=None))
+        specs.append(dict(spec('bad-size'), size=66))
+        specs.append(dict(spec('bad-option'), colour='blue'))
+        results = self.provision(specs)
+        self.assertEqual(len(results), len(specs))
+        for name in ('no-region', 'bad-size', 'bad-option'):
+            self.assertIsInstance(results[name], DOPException)
+        for i in range(10):
+            self.assertEqual(results['web%d' % i].status, 'active')
+
+    def test_other_errors_are_not_reported_as_specs(self):
+        def create_droplet(**spec):
+            raise RuntimeError('bug')
+        self.client.create_droplet = create_droplet
+        with self.assertRaises(RuntimeError):
+            self.provision([spec('web')])
+
+    def test_no_busy_loop_while_creating(self):
+        api = self.start(latency=0.3)
+        calls = []
+
+        def clock():
+            calls.append(None)
+            return time.time()
+        results = list(self.client.provision_droplets(
+            [spec('web1'), spec('web2')], timeout=30, poll_interval=0.05,
+            clock=clock))
+        self.assertEqual(len(results), 2)
+        # Two creates then at most a few polls, not a loop spinning until
+        # the creates complete.
+        self.assertLess(len(calls), 50)
+        self.assertLess(api.requests, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Token buckets, with an injected clock instead of real sleeps.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from dop.ratelimit import FileTokenBucket, TokenBucket, fcntl
+
+
+class FakeClock(object):
+    """
+    Clock that only moves when told to, recording the sleeps asked for.
+    """
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def bucket(self, rate, burst=None):
+        return TokenBucket(rate, burst, clock=self.clock,
+                           sleep=self.clock.sleep)
+
+    def test_burst_goes_through(self):
+        bucket = self.bucket(rate=5, burst=3)
+        for _ in range(3):
+            bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_callers_are_spaced_at_the_rate(self):
+        bucket = self.bucket(rate=5, burst=1)
+        for _ in range(4):
+            bucket.acquire()
+        # Each caller reserves the next token: 0.2 s apart.
+        self.assertEqual(self.clock.sleeps, [0.2, 0.4, 0.6])
+
+    def test_refill(self):
+        bucket = self.bucket(rate=2, burst=4)
+        for _ in range(4):
+            bucket.acquire()
+        self.clock.now += 1.0
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+        bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+    def test_refill_is_capped_at_burst(self):
+        bucket = self.bucket(rate=10, burst=2)
+        self.clock.now += 3600
+        for _ in range(3):
+            bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [0.1])
+
+    def test_default_burst_and_invalid_rate(self):
+        self.assertEqual(self.bucket(rate=5).burst, 5.0)
+        self.assertEqual(self.bucket(rate=0.5).burst, 1.0)
+        self.assertRaises(ValueError, self.bucket, 0)
+
+    def test_threads_share_the_rate(self):
+        bucket = self.bucket(rate=10, burst=1)
+        threads = [threading.Thread(target=bucket.acquire)
+                   for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(self.clock.sleeps),
+                         [round(0.1 * n, 6) for n in range(1, 10)])
+
+
+@unittest.skipIf(fcntl is None, 'needs fcntl')
+class FileTokenBucketTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.filename = os.path.join(directory, 'dop.bucket')
+        self.clock = FakeClock()
+
+    def bucket(self):
+        bucket = FileTokenBucket(self.filename, rate=4, burst=2,
+                                 clock=self.clock, sleep=self.clock.sleep)
+        self.addCleanup(bucket.close)
+        return bucket
+
+    def test_buckets_share_the_file(self):
+        first = self.bucket()
+        second = self.bucket()
+        first.acquire()
+        second.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+        first.acquire()
+        second.acquire()
+        self.assertEqual(self.clock.sleeps, [0.25, 0.5])
+        self.clock.now += 10
+        self.bucket().acquire()
+        self.assertEqual(len(self.clock.sleeps), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
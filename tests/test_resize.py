@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Size arguments of resize_droplet against the local fake API.
+"""
+
+import unittest
+
+from dop.exceptions import DOPException
+from tests.base import FakeAPITestCase
+
+
+class ResizeTest(FakeAPITestCase):
+
+    def resized(self, size):
+        self.client.resize_droplet(1, size)
+        return self.api.droplets[1]['size_id']
+
+    def test_ids(self):
+        self.assertEqual(self.resized(62), 62)
+        self.assertEqual(self.resized('64'), 64)
+        self.assertEqual(self.resized({'size_id': 63}), 63)
+
+    def test_slugs(self):
+        self.assertEqual(self.resized('2gb'), 62)
+        self.assertEqual(self.resized({'size_slug': '4gb'}), 64)
+
+    def test_models(self):
+        size = [s for s in self.client.sizes() if s.size_id == 63][0]
+        self.assertEqual(self.resized(size), 63)
+
+    def test_unknown_slug(self):
+        self.assertRaises(DOPException, self.client.resize_droplet, 1, '3gb')
+
+
+if __name__ == '__main__':
+    unittest.main()
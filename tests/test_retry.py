@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Retry policy decisions and delays.
+"""
+
+import unittest
+from email.utils import formatdate
+
+from dop.exceptions import DOPException, TransportError
+from dop.retry import RetryPolicy, is_idempotent, retry_after
+from tests.base import FakeAPITestCase
+
+NOW = 1400000000.0
+
+
+class RetryAfterTest(unittest.TestCase):
+
+    def test_seconds(self):
+        self.assertEqual(retry_after({'Retry-After': '120'}, NOW), 120.0)
+        self.assertEqual(retry_after({'Retry-After': ' 0 '}, NOW), 0.0)
+
+    def test_http_date(self):
+        date = formatdate(NOW + 30, usegmt=True)
+        self.assertEqual(retry_after({'Retry-After': date}, NOW), 30.0)
+        past = formatdate(NOW - 30, usegmt=True)
+        self.assertEqual(retry_after({'Retry-After': past}, NOW), 0.0)
+
+    def test_rate_limit_headers(self):
+        headers = {'RateLimit-Remaining': '0',
+                   'RateLimit-Reset': str(int(NOW) + 45)}
+        self.assertEqual(retry_after(headers, NOW), 45.0)
+        headers['RateLimit-Remaining'] = '3'
+        self.assertIsNone(retry_after(headers, NOW))
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(retry_after({}, NOW))
+        self.assertIsNone(retry_after({'Retry-After': 'soon'}, NOW))
+        self.assertIsNone(retry_after({'Retry-After': '-5'}, NOW))
+
+
+class ShouldRetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3)
+
+    def test_idempotent(self):
+        self.assertTrue(is_idempotent('GET', '/droplets/1'))
+        self.assertTrue(is_idempotent('GET', '/droplets/'))
+        self.assertFalse(is_idempotent('GET', '/droplets/1/reboot'))
+        self.assertFalse(is_idempotent('GET', '/droplets/new'))
+        self.assertFalse(is_idempotent('POST', '/droplets/1'))
+
+    def test_statuses(self):
+        retry = self.policy.should_retry
+        self.assertTrue(retry(1, 'GET', '/droplets/1', status=503))
+        self.assertTrue(retry(2, 'GET', '/droplets/1', status=429))
+        self.assertFalse(retry(1, 'GET', '/droplets/1', status=404))
+        self.assertFalse(retry(3, 'GET', '/droplets/1', status=503))
+
+    def test_actions(self):
+        retry = self.policy.should_retry
+        self.assertFalse(retry(1, 'GET', '/droplets/1/reboot', status=503))
+        self.assertFalse(retry(1, 'GET', '/droplets/1/reboot',
+                               error=TransportError('reset')))
+        # Never reached the server.
+        self.assertTrue(retry(1, 'GET', '/droplets/1/reboot', status=429))
+        self.assertTrue(retry(1, 'GET', '/droplets/1/reboot',
+                              error=TransportError('refused', connect_failed=True)))
+        policy = RetryPolicy(retry_non_idempotent=True)
+        self.assertTrue(policy.should_retry(1, 'GET', '/droplets/1/reboot',
+                                            status=503))
+
+
+class DelayTest(unittest.TestCase):
+
+    def test_exponential_without_jitter(self):
+        policy = RetryPolicy(backoff=0.5, max_backoff=3.0, jitter=False)
+        self.assertEqual([policy.delay(n) for n in range(1, 6)],
+                         [0.5, 1.0, 2.0, 3.0, 3.0])
+
+    def test_jitter_bounds(self):
+        for value in (0.0, 0.5, 0.999):
+            policy = RetryPolicy(backoff=1.0, max_backoff=5.0,
+                                 random=lambda: value)
+            self.assertEqual(policy.delay(3), 4.0 * value)
+        policy = RetryPolicy(backoff=1.0, max_backoff=5.0)
+        for attempt in range(1, 10):
+            bound = min(5.0, 2.0 ** (attempt - 1))
+            for _ in range(100):
+                self.assertTrue(0.0 <= policy.delay(attempt) <= bound)
+
+    def test_server_delay(self):
+        policy = RetryPolicy(max_backoff=10.0)
+        self.assertEqual(policy.delay(1, {'Retry-After': '7'}), 7.0)
+        self.assertIsNone(policy.delay(1, {'Retry-After': '60'}))
+        policy = RetryPolicy(backoff=1.0, jitter=False)
+        self.assertEqual(policy.delay(2, {}), 2.0)
+
+
+class ClientRetryTest(FakeAPITestCase):
+
+    api_options = {'droplets': 5, 'domains': 1, 'error_rate': 1.0,
+                   'error_status': 503}
+
+    def setUp(self):
+        super(ClientRetryTest, self).setUp()
+        self.delays = []
+        policy = RetryPolicy(max_attempts=3, sleep=self.delays.append)
+        self.client = self.new_client(retry_policy=policy)
+
+    def test_reads_are_retried(self):
+        self.assertRaises(DOPException, self.client.show_droplet, 1)
+        self.assertEqual(self.api.requests, 3)
+        self.assertEqual(len(self.delays), 2)
+
+    def test_actions_are_not_retried(self):
+        self.assertRaises(DOPException, self.client.reboot_droplet, 1)
+        self.assertEqual(self.api.requests, 1)
+        self.assertEqual(self.delays, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
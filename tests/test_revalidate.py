@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Conditional requests and body hashing against the local fake API.
+"""
+
+import unittest
+
+from dop.metrics import MetricsCollector
+from tests.base import FakeAPITestCase
+
+
+class RevalidateTest(FakeAPITestCase):
+
+    api_options = {'droplets': 20, 'domains': 2}
+    client_options = {'revalidate': True}
+    autostart = False
+
+    def client_for(self, **api_options):
+        api = self.start(**api_options)
+        return api, self.client
+
+    def test_not_modified_reuses_models(self):
+        api, client = self.client_for(etags=True)
+        first = client.droplets()
+        second = client.droplets()
+        self.assertIs(first[0], second[0])
+        stats = client.stats()['revalidation']
+        self.assertEqual(stats['not_modified'], 1)
+        self.assertEqual(stats['models_reused'], 1)
+
+    def test_unchanged_body_without_etag(self):
+        api, client = self.client_for()
+        client.domain_records(1)
+        client.domain_records(1)
+        self.assertEqual(client.stats()['revalidation']['unchanged'], 1)
+
+    def test_changed_body_is_parsed(self):
+        api, client = self.client_for(etags=True)
+        client.droplets()
+        api.droplets[1]['status'] = 'off'
+        droplets = client.droplets()
+        self.assertEqual([d.status for d in droplets
+                          if d.droplet_id == 1], ['off'])
+        self.assertEqual(client.stats()['revalidation']['changed'], 2)
+
+    def test_actions_are_not_revalidated(self):
+        api, client = self.client_for(etags=True)
+        client.reboot_droplet(1)
+        client.reboot_droplet(1)
+        self.assertEqual(client.stats()['revalidation']['entries'], 0)
+
+    def test_not_modified_is_not_an_error(self):
+        api, client = self.client_for(etags=True)
+        metrics = MetricsCollector().install(client)
+        for _ in range(3):
+            client.droplets()
+        droplets = metrics.as_dict()['/droplets']
+        self.assertEqual(droplets['count'], 3)
+        self.assertEqual(droplets['errors'], 0)
+        self.assertEqual(droplets['statuses'], {200: 1, 304: 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental parsing of list responses.
+"""
+
+import json
+import unittest
+
+from dop.exceptions import DOPException
+from dop.streaming import iter_json_array
+
+DOCUMENT = {
+    'status': 'OK',
+    'total': -12.5e3,
+    'droplets': [
+        {'id': 1, 'name': 'café ☃ \U0001f600', 'size_id': 66,
+         'ip_address': None, 'backups': [], 'locked': False},
+        {'id': 23456, 'name': 'quote " backslash \\ slash / \t tab\n',
+         'nested': {'a': [1, [2, [3.25, {}]]], 'b': {'c': True}}},
+        {'id': 7, 'name': 'x' * 50, 'ratio': 1e-7, 'big': 12345678901234},
+        'text',
+        -0.5,
+        [],
+    ],
+    'meta': {'droplets': [9, 9], 'escaped': '\\u0041'},
+}
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class IterJsonArrayTest(unittest.TestCase):
+
+    def payloads(self):
+        yield json.dumps(DOCUMENT).encode('utf8')
+        yield json.dumps(DOCUMENT, ensure_ascii=False).encode('utf8')
+        yield json.dumps(DOCUMENT, indent=2).encode('utf8')
+
+    def test_chunk_boundaries(self):
+        for payload in self.payloads():
+            for size in (1, 2, 3, 7, len(payload)):
+                members = {}
+                items = list(iter_json_array(chunked(payload, size),
+                                             'droplets', members))
+                self.assertEqual(items, DOCUMENT['droplets'], size)
+                self.assertEqual(members, {'status': 'OK',
+                                           'total': DOCUMENT['total'],
+                                           'meta': DOCUMENT['meta']})
+
+    def test_numbers_split_across_chunks(self):
+        payload = b'{"droplets": [12345, -6.25e-3, 0], "status": "OK"}'
+        for size in (1, 2, 3):
+            self.assertEqual(
+                list(iter_json_array(chunked(payload, size), 'droplets')),
+                [12345, -6.25e-3, 0])
+
+    def test_empty(self):
+        self.assertEqual(list(iter_json_array([b'{}'], 'droplets')), [])
+        members = {}
+        items = list(iter_json_array([b'{"droplets": [], "status": "OK"}'],
+                                     'droplets', members))
+        self.assertEqual(items, [])
+        self.assertEqual(members, {'status': 'OK'})
+
+    def test_error_document(self):
+        members = {}
+        payload = b'{"status": "ERROR", "error_message": "Access Denied"}'
+        self.assertEqual(list(iter_json_array(chunked(payload, 2),
+                                              'droplets', members)), [])
+        self.assertEqual(members['error_message'], 'Access Denied')
+
+    def test_truncated(self):
+        payload = json.dumps(DOCUMENT, ensure_ascii=False).encode('utf8')
+        for end in range(len(payload)):
+            for size in (1, 3):
+                chunks = chunked(payload[:end], size)
+                with self.assertRaises(DOPException, msg=end):
+                    list(iter_json_array(chunks, 'droplets'))
+
+    def test_invalid(self):
+        for payload in (b'[1, 2]', b'{"droplets": [1 2]}',
+                        b'{"droplets": [1], "status": "OK" "x": 1}',
+                        b'{"droplets": [nope]}',
+                        b'{"droplets": ["\xff"]}'):
+            with self.assertRaises(DOPException, msg=payload):
+                list(iter_json_array(chunked(payload, 2), 'droplets'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Response sizes reported to hooks against the local fake API.
+"""
+
+import unittest
+
+from tests.base import FakeAPITestCase
+
+
+class TransferTest(FakeAPITestCase):
+
+    api_options = {'droplets': 200, 'domains': 1, 'compress': True}
+
+    def setUp(self):
+        super(TransferTest, self).setUp()
+        self.infos = []
+        self.client.add_hook('after_response',
+                             lambda info, response: self.infos.append(info))
+
+    def test_read_response_sizes(self):
+        self.client.droplets()
+        info, = self.infos
+        self.assertLess(info['wire_bytes'], info['bytes'])
+        transfer = self.client.stats()['transfer']
+        self.assertEqual(transfer['wire_bytes'], info['wire_bytes'])
+        self.assertEqual(transfer['decoded_bytes'], info['bytes'])
+
+    def test_streamed_response_sizes_are_unknown(self):
+        droplets = list(self.client.iter_droplets())
+        self.assertEqual(len(droplets), 200)
+        info, = self.infos
+        self.assertIsNone(info['bytes'])
+        self.assertIsNone(info['wire_bytes'])
+        transfer = self.client.stats()['transfer']
+        self.assertLess(transfer['wire_bytes'], transfer['decoded_bytes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Waiting for events against the local fake API.
+"""
+
+import unittest
+
+from dop.exceptions import DOPException
+from dop.waiter import EventWaiter
+from tests.base import FakeAPITestCase
+
+
+class EventWaiterTest(FakeAPITestCase):
+
+    autostart = False
+
+    def test_bulk_results_are_waited_for(self):
+        self.start(event_time=0.05)
+        client = self.client
+        results = client.reboot_droplets([1, 2, 999])
+        waiter = EventWaiter(client, min_interval=0.01)
+        events = waiter.wait(results.values(), timeout=30)
+        self.assertEqual(sorted(events), sorted([results[1], results[2]]))
+        for event in events.values():
+            self.assertEqual(event.action_status, 'done')
+
+    def test_timeout(self):
+        self.start(event_time=60)
+        client = self.client
+        first, second = client.reboot_droplets([1, 2]).values()
+        waiter = EventWaiter(client, min_interval=0.01)
+        with self.assertRaises(DOPException) as raised:
+            waiter.wait([first, str(second), DOPException('failed')],
+                        timeout=0.1)
+        self.assertIn(str(second), str(raised.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()